@@ -0,0 +1,27 @@
+"""diagnosis_add_qa_pairs
+
+Revision ID: c3f1a9d27b54
+Revises: e0181a716125
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a9d27b54"
+down_revision: Union[str, Sequence[str], None] = "e0181a716125"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("diagnosis", sa.Column("qa_pairs", sa.JSON, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("diagnosis", "qa_pairs")
@@ -0,0 +1,216 @@
+"""
+Bulk re-diagnosis of completed interviews.
+
+Each NDJSON line is one transcript:
+
+    {"id": "abc", "pain_points": ["head", "chest"],
+     "questions": ["Do you have a fever?", ...], "answers": ["yes", ...]}
+
+Command line:
+
+    python -m app.ai.batch transcripts.ndjson --concurrency 8 --rate 5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from time import monotonic, perf_counter
+
+from .client_pool import get_gemini_client
+from .config import AISettings
+from .prompts import diagnosis_prompt
+from .rate_limit import TokenBucket, backoff_delay, is_retryable
+from .telemetry import percentile
+
+
+class BatchReport:
+    def __init__(self):
+        self.started = monotonic()
+        self.finished = None
+        self.succeeded = 0
+        self.failed = 0
+        self.latencies = []
+
+    def record(self, result: dict):
+        if result["ok"]:
+            self.succeeded += 1
+            self.latencies.append(result["latency_ms"])
+        else:
+            self.failed += 1
+
+    def to_dict(self) -> dict:
+        elapsed = (self.finished or monotonic()) - self.started
+        total = self.succeeded + self.failed
+        latencies = sorted(self.latencies)
+        return {
+            "items": total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(total / elapsed, 3) if elapsed else None,
+            "latency_ms_p50": percentile(latencies, 0.50),
+            "latency_ms_p95": percentile(latencies, 0.95),
+            "latency_ms_max": latencies[-1] if latencies else None,
+        }
+
+
+def parse_transcript(line: str, index: int) -> dict:
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("transcript must be a JSON object")
+    pain_points = data.get("pain_points") or []
+    if isinstance(pain_points, list) and _all_strings(pain_points):
+        pain_points = ", ".join(pain_points)
+    if not isinstance(pain_points, str):
+        raise ValueError("pain_points must be a string or a list of strings")
+    questions, answers = data.get("questions") or [], data.get("answers") or []
+    if not (
+        isinstance(questions, list)
+        and isinstance(answers, list)
+        and _all_strings(questions + answers)
+    ):
+        raise ValueError("questions and answers must be lists of strings")
+    if not pain_points or len(questions) != len(answers):
+        raise ValueError("transcript needs pain_points and matching questions/answers")
+    return {
+        "id": data.get("id", index),
+        "prompt": diagnosis_prompt(pain_points, dict(zip(questions, answers))),
+    }
+
+
+def _all_strings(values: list) -> bool:
+    return all(isinstance(value, str) for value in values)
+
+
+async def _diagnose(client, item: dict, bucket: TokenBucket, retries: int) -> dict:
+    # The retries are all made here, paced by the batch's own bucket; the
+    # scheduler is told not to add its own, so `attempts` counts every call.
+    attempts = 0
+    while True:
+        attempts += 1
+        await bucket.acquire()
+        start = perf_counter()
+        try:
+            response = await client.generate_response(
+                item["prompt"], kind="batch", route="diagnosis", retries=0
+            )
+        except Exception as e:
+            if attempts <= retries and is_retryable(e):
+                await asyncio.sleep(backoff_delay(attempts - 1))
+                continue
+            return {
+                "id": item["id"],
+                "ok": False,
+                "error": str(e),
+                "attempts": attempts,
+            }
+        return {
+            "id": item["id"],
+            "ok": True,
+            "response": response,
+            "latency_ms": round((perf_counter() - start) * 1000, 1),
+            "attempts": attempts,
+        }
+
+
+async def run_batch(client, lines, concurrency: int, retries: int, rate: float, report):
+    """
+    Diagnose every transcript in `lines` with at most `concurrency` calls in
+    flight and at most `rate` calls started per second. Yields one result
+    per line in completion order; `report` is filled in as results arrive.
+    """
+    bucket = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = asyncio.Queue()
+
+    async def worker(index: int, line: str):
+        # Every line must put exactly one result, or the loop below waits
+        # for it forever.
+        result = {"id": index, "ok": False, "error": "not processed"}
+        try:
+            async with semaphore:
+                try:
+                    item = parse_transcript(line, index)
+                except ValueError as e:
+                    result = {"id": index, "ok": False, "error": f"bad transcript: {e}"}
+                else:
+                    result = await _diagnose(client, item, bucket, retries)
+        except Exception as e:
+            result = {"id": index, "ok": False, "error": str(e)}
+        finally:
+            results.put_nowait(result)
+
+    tasks = [
+        asyncio.create_task(worker(index, line))
+        for index, line in enumerate(lines)
+        if line.strip()
+    ]
+    try:
+        for _ in range(len(tasks)):
+            result = await results.get()
+            report.record(result)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        report.finished = monotonic()
+
+
+def batch_limits(concurrency=None, retries=None, rate=None, clamp=False):
+    """
+    Fill unset limits from AISettings; with clamp, never exceed them.
+    Raises ValueError for a concurrency below 1, negative retries or a rate
+    that is not positive (a zero rate would mean no limit at all).
+    """
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if retries is not None and retries < 0:
+        raise ValueError("retries must not be negative")
+    if rate is not None and not rate > 0:
+        raise ValueError("rate must be positive")
+    settings = AISettings()
+    limits = (
+        settings.batch_concurrency,
+        settings.batch_max_retries,
+        settings.batch_rate_limit,
+    )
+    requested = (concurrency, retries, rate)
+    return tuple(
+        default if value is None else min(value, default) if clamp else value
+        for value, default in zip(requested, limits)
+    )
+
+
+async def _main(args, limits):
+    concurrency, retries, rate = limits
+    with open(args.input, encoding="utf-8") as f:
+        lines = f.readlines()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    report = BatchReport()
+    try:
+        async for result in run_batch(
+            get_gemini_client(), lines, concurrency, retries, rate, report
+        ):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(report.to_dict(), indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run diagnosis on transcripts")
+    parser.add_argument("input", help="NDJSON file, one transcript per line")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--retries", type=int)
+    parser.add_argument("--rate", type=float, help="max calls started per second")
+    args = parser.parse_args()
+    try:
+        limits = batch_limits(args.concurrency, args.retries, args.rate)
+    except ValueError as e:
+        parser.error(str(e))
+    asyncio.run(_main(args, limits))
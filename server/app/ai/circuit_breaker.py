@@ -0,0 +1,129 @@
+import threading
+from time import monotonic
+
+from .config import AISettings
+
+
+class CircuitOpen(Exception):
+    """Gemini has failed repeatedly; calls are refused until the cool-down ends."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Gemini is unavailable, try again shortly")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` upstream calls fail in a row, then open
+    for `reset_timeout` seconds, refusing calls at once instead of letting
+    them queue behind a failing API. After that a single trial call is let
+    through (half open); its success closes the circuit, its failure opens
+    it again.
+
+    check() returns True for the call that got the trial slot; that call
+    passes `trial=True` to record_success/record_failure/abandon so only it
+    can free the slot.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._stats = {"trips": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def check(self) -> bool:
+        """
+        Raise CircuitOpen unless a call may go upstream now. Returns True
+        when the caller got the half-open trial slot.
+        """
+        if self.failure_threshold <= 0:
+            return False
+        with self._lock:
+            if self._state == "closed":
+                return False
+            remaining = self._opened_at + self.reset_timeout - monotonic()
+            if remaining <= 0 and not self._trial_running:
+                self._state = "half_open"
+                self._trial_running = True
+                return True
+            self._stats["rejected"] += 1
+        raise CircuitOpen(retry_after=max(remaining, 1))
+
+    def admit(self) -> "Admission":
+        """check() for a call that may queue before it goes upstream."""
+        return Admission(self, self.check())
+
+    def record_success(self, trial: bool = False):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            self._state = "closed"
+            if trial:
+                self._trial_running = False
+
+    def record_failure(self, trial: bool = False):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if trial:
+                self._trial_running = False
+            if trial or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = monotonic()
+                self._stats["trips"] += 1
+
+    def abandon(self, trial: bool = False):
+        """The call ended before it proved anything either way."""
+        if not trial:
+            return
+        with self._lock:
+            self._trial_running = False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._state != "closed"
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            stats["consecutive_failures"] = self._failures
+        stats["failure_threshold"] = self.failure_threshold
+        stats["reset_timeout_s"] = self.reset_timeout
+        return stats
+
+
+class Admission:
+    """
+    A call let through by the breaker before it was queued. If it holds the
+    trial slot, the slot goes to the first attempt that actually reaches
+    upstream (take()); release() hands it back when the call ends without
+    one, e.g. it joined another caller's request or never left the queue.
+    """
+
+    __slots__ = ("breaker", "trial")
+
+    def __init__(self, breaker: CircuitBreaker, trial: bool):
+        self.breaker = breaker
+        self.trial = trial
+
+    def take(self) -> bool:
+        trial, self.trial = self.trial, False
+        return trial
+
+    def release(self):
+        if self.take():
+            self.breaker.abandon(trial=True)
+
+
+_settings = AISettings()
+breaker = CircuitBreaker(
+    failure_threshold=_settings.circuit_failure_threshold,
+    reset_timeout=_settings.circuit_reset_timeout,
+)
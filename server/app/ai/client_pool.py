@@ -0,0 +1,47 @@
+import threading
+
+from .gemini_client import GeminiClient
+
+# One GeminiClient per worker process. genai.configure() drops every cached
+# transport, so building a client per request throws away warm channels.
+_client = None
+_lock = threading.Lock()
+
+_stats = {
+    "clients_created": 0,
+    "requests_served": 0,
+    "reuses": 0,
+    "resets": 0,
+}
+
+
+def get_gemini_client() -> GeminiClient:
+    global _client
+
+    with _lock:
+        if _client is None:
+            _client = GeminiClient()
+            _stats["clients_created"] += 1
+        else:
+            _stats["reuses"] += 1
+        _stats["requests_served"] += 1
+        return _client
+
+
+def reset_gemini_client():
+    """Drop the pooled client so the next call re-reads AISettings."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _stats["resets"] += 1
+        _client = None
+
+
+def pool_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["connection_churn"] = stats["clients_created"] + stats["resets"]
+    stats["reuse_ratio"] = (
+        stats["reuses"] / stats["requests_served"] if stats["requests_served"] else 0.0
+    )
+    return stats
@@ -6,6 +6,94 @@ class AISettings(BaseSettings):
     gemini_api_key: str
     gemini_model: str = "gemini-2.0-flash"
 
+    # Model and generation config per prompt kind, as JSON in LLM_ROUTES, e.g.
+    # {"next": {"model": "gemini-2.0-flash-lite", "max_output_tokens": 64}}.
+    # A route without "model" uses gemini_model. Follow-up questions are one
+    # short sentence, so capping their output mostly cuts tail latency.
+    llm_routes: dict = {
+        "initial": {"max_output_tokens": 256, "temperature": 0.4},
+        "next": {"max_output_tokens": 256, "temperature": 0.4},
+        "summarization": {"max_output_tokens": 256, "temperature": 0.2},
+        "diagnosis": {"max_output_tokens": 1024, "temperature": 0.2},
+    }
+
+    # "loop" runs LLM coroutines on a long-lived per-worker event loop,
+    # "per_request" keeps the old asyncio.run() behaviour. Only the per-worker
+    # loop is scheduled, so per_request calls skip the LLM scheduler's rate
+    # limit, priorities and queue (counted as "unscheduled" in its stats).
+    llm_execution_mode: str = "loop"
+
+    # Response cache in front of generate_response; size 0 disables it.
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 3600
+
+    # Precompute the follow-up question for both yes/no answers in the background.
+    # A branch still running when its answer arrives is waited on for at most
+    # speculation_max_wait seconds before it is cancelled and asked afresh.
+    speculation_enabled: bool = False
+    speculation_max_in_flight: int = 8
+    speculation_ttl: int = 60
+    speculation_max_wait: float = 1.0
+
+    # Once the verbatim Q/A history passes this many (estimated) tokens, older
+    # turns are folded into a rolling summary. 0 always sends the full history.
+    prompt_history_budget: int = 1200
+    prompt_recent_turns: int = 3
+
+    # "local" answers known question paths from a triage graph before calling
+    # Gemini; "off" sends every step to the LLM.
+    triage_mode: str = "off"
+    triage_graph_path: str = ""
+
+    # Bulk diagnosis (/api/questions/batch and python -m app.ai.batch). The
+    # endpoint treats these as upper bounds for its query parameters.
+    batch_concurrency: int = 8
+    batch_max_retries: int = 3
+    batch_rate_limit: float = 5.0
+
+    # Central LLM scheduler. llm_rate_limit is calls per second across the
+    # worker (0 = unlimited); llm_queue_deadline is how long a call may wait
+    # for a slot before it fails.
+    llm_rate_limit: float = 0
+    llm_rate_burst: float = 0
+    llm_max_concurrency: int = 32
+    llm_queue_size: int = 256
+    llm_queue_deadline: float = 30
+    llm_max_retries: int = 2
+
+    # Hedging: when a call has not answered after the llm_hedge_percentile
+    # latency recently seen for its kind (at least llm_hedge_min_delay_ms), a
+    # duplicate is sent and the first reply wins. llm_hedge_budget caps the
+    # share of calls that may be hedged.
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_delay_ms: float = 250
+    llm_hedge_budget: float = 0.1
+
+    # Circuit breaker: after circuit_failure_threshold consecutive failed
+    # Gemini calls, refuse calls for circuit_reset_timeout seconds and serve
+    # the fallback instead (0 disables).
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30
+
+    # Ask Gemini for JSON matching app.schemas.questionSchemas instead of
+    # free text, so /next can report is_final and the diagnosis is stored as
+    # fields rather than a blob. Streaming endpoints stay plain text.
+    structured_output: bool = False
+
+    # Simulated backend used with USE_GPT_MOCK=sim. mock_latency_ms is the
+    # typical time to first token (the median for lognormal, whose tail is
+    # set by sigma; the mean for fixed, uniform and exponential).
+    mock_latency_distribution: str = "lognormal"
+    mock_latency_ms: float = 1500
+    mock_latency_sigma: float = 0.5
+    mock_error_rate_429: float = 0.0
+    mock_error_rate_500: float = 0.0
+    mock_timeout_rate: float = 0.0
+    mock_timeout_s: float = 30
+    mock_completion_tokens: int = 40
+    mock_tokens_per_second: float = 80
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore extra fields from .env
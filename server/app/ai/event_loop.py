@@ -0,0 +1,98 @@
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+
+from ..utils.per_process import PerProcess
+from .config import AISettings
+
+
+class LoopRunner:
+    """A daemon thread running one asyncio loop for the lifetime of the worker.
+
+    grpc.aio channels are bound to the loop that created them, so keeping a
+    single loop is what lets the pooled GeminiClient actually reuse them.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="llm-event-loop", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+
+
+# gunicorn may fork after import; each worker gets its own loop thread.
+_runner = PerProcess(LoopRunner)
+_mode = None
+
+
+def get_loop_runner() -> LoopRunner:
+    return _runner.get()
+
+
+def current_loop():
+    """This worker's LLM loop, or None if it has not been started yet."""
+    runner = _runner.current()
+    return runner.loop if runner is not None else None
+
+
+def execution_mode() -> str:
+    global _mode
+    if _mode is None:
+        _mode = AISettings().llm_execution_mode
+    return _mode
+
+
+def run_llm(coro):
+    """Run an LLM coroutine from a sync view using the configured mode."""
+    if execution_mode() == "per_request":
+        return asyncio.run(coro)
+    return get_loop_runner().run(coro)
+
+
+def iterate_llm(agen):
+    """Drive an async generator from sync code, one item per step.
+
+    Used for streaming responses where the WSGI server pulls chunks from a
+    plain generator.
+    """
+    if execution_mode() == "per_request":
+        loop = asyncio.new_event_loop()
+        step = loop.run_until_complete
+    else:
+        loop = None
+        step = get_loop_runner().run
+
+    try:
+        while True:
+            try:
+                yield step(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        step(agen.aclose())
+        if loop is not None:
+            loop.close()
+
+
+@atexit.register
+def _shutdown():
+    runner = _runner.current()
+    if runner is not None:
+        runner.stop()
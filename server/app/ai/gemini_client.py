@@ -1,28 +1,274 @@
 import os
 import json
+import logging
 import google.generativeai as genai
+from pydantic import ValidationError
+from .circuit_breaker import breaker
 from .config import AISettings
+from .hedging import hedger
+from .mock_backend import SimulatedModel
+from .scheduler import scheduler
+from .singleflight import inflight, prompt_key
+from .rate_limit import is_retryable
+from .routing import Route, router
+from .telemetry import LLMCall, add_to_usage, telemetry
+
+logger = logging.getLogger(__name__)
+
+# Attempts at a reply that parses as the requested schema before giving up.
+STRUCTURED_ATTEMPTS = 2
+
+
+class StructuredOutputInvalid(ValueError):
+    """Gemini's replies did not parse as the requested schema."""
 
 
 class GeminiClient:
     def __init__(self):
-        self.use_mock = os.getenv("USE_GPT_MOCK", "0") == "1"
+        mock_mode = os.getenv("USE_GPT_MOCK", "0")
+        self.use_mock = mock_mode == "1"
+        self.simulated = mock_mode == "sim"
+        # One model object per routed model name, built on first use.
+        self._models = {}
 
-        if not self.use_mock:
+        if self.simulated:
+            # Offline backend with realistic latency and failures, see mock_backend.
+            self.settings = AISettings()
+            self.model = self._model(router.route("default"))
+        elif not self.use_mock:
             self.settings = AISettings()
             genai.configure(api_key=self.settings.gemini_api_key)
-            self.model = genai.GenerativeModel(self.settings.gemini_model)
+            self.model = self._model(router.route("default"))
+
+    async def generate_response(
+        self,
+        prompt: str,
+        kind: str = "default",
+        usage: dict = None,
+        route=None,
+        retries: int = None,
+    ) -> str:
+        """
+        `kind` sets the scheduling priority and telemetry bucket, `route` (by
+        default the same) the model and generation config used. `retries`
+        overrides the scheduler's retry count, e.g. 0 for callers that retry
+        on their own.
+        """
+        route = router.route(route or kind)
+        call = LLMCall(kind, self.model_for(route.kind), route.kind)
+        return await self._request(
+            call,
+            usage,
+            prompt_key(call.model, prompt),
+            lambda: self._generate(prompt, route, call),
+            retries,
+        )
+
+    async def generate_structured(
+        self, prompt: str, schema, kind: str = "default", usage: dict = None, route=None
+    ):
+        """
+        Ask Gemini for JSON matching the pydantic `schema` and parse it into
+        an instance of it; raises StructuredOutputInvalid if it cannot be.
+        """
+        route = router.route(route or kind)
+        call = LLMCall(kind, self.model_for(route.kind), route.kind)
+        return await self._request(
+            call,
+            usage,
+            prompt_key(f"{call.model}:{schema.__name__}", prompt),
+            lambda: self._generate_structured(prompt, schema, route, call),
+        )
+
+    async def _request(
+        self, call: LLMCall, usage: dict, key: str, attempt, retries: int = None
+    ):
+        """
+        Identical prompts already in flight share one upstream request, which
+        then waits its turn in the scheduler according to the call's kind.
+        The call is recorded in telemetry, and in `usage` (the session's
+        running totals) when given.
+        """
+        admission = None
+        try:
+            admission = breaker.admit()
+            return await inflight.do(
+                key,
+                lambda: scheduler.submit(
+                    call.kind,
+                    lambda: self._upstream(call.kind, attempt, admission),
+                    max_retries=retries,
+                ),
+            )
+        except BaseException as e:
+            call.failed(e)
+            raise
+        finally:
+            if admission is not None:
+                admission.release()
+            self._record(call, usage)
+
+    def _record(self, call: LLMCall, usage: dict):
+        call.finish()
+        telemetry.record(call)
+        if usage is not None:
+            add_to_usage(usage, call)
+
+    def _model(self, route: Route):
+        model = self._models.get(route.model)
+        if model is None:
+            if self.simulated:
+                model = SimulatedModel.from_settings(self.settings, route.model)
+            else:
+                model = genai.GenerativeModel(route.model)
+            self._models[route.model] = model
+        return model
+
+    async def _upstream(self, kind: str, make_coro, admission=None, hedge=True):
+        """
+        One scheduled call to Gemini, hedged against slow replies and counted
+        by the circuit breaker. The first attempt inherits the trial slot the
+        call was admitted with, if any; other attempts check the breaker
+        again, as the circuit may have opened while the call was queued.
+        """
+        trial = admission.take() if admission is not None else False
+        if not trial:
+            trial = breaker.check()
+        try:
+            if hedge:
+                result = await hedger.run(kind, make_coro)
+            else:
+                result = await make_coro()
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure(trial)
+            else:
+                breaker.abandon(trial)
+            raise
+        except BaseException:
+            breaker.abandon(trial)
+            raise
+        breaker.record_success(trial)
+        return result
 
-    async def generate_response(self, prompt: str) -> str:
+    async def _generate_structured(
+        self, prompt: str, schema, route: Route, call: LLMCall
+    ):
+        """
+        A reply cut off at max_output_tokens, or missing a field (the SDK
+        sends the schema without a `required` list), does not validate; it
+        is asked for once more, then StructuredOutputInvalid is raised.
+        """
+        call.dispatched()
+        if self.use_mock:
+            return schema.model_validate_json(self._mock_structured(schema))
+
+        for attempt in range(STRUCTURED_ATTEMPTS):
+            response = await self._model(route).generate_content_async(
+                prompt,
+                generation_config={
+                    **route.generation_config,
+                    "response_mime_type": "application/json",
+                    "response_schema": schema,
+                },
+            )
+            call.add_usage(response.usage_metadata)
+            try:
+                return schema.model_validate_json(response.text)
+            except (ValidationError, ValueError) as e:
+                error = e
+                logger.warning(
+                    "%s reply %d did not match %s: %s",
+                    route.kind,
+                    attempt + 1,
+                    schema.__name__,
+                    e,
+                )
+        raise StructuredOutputInvalid(
+            f"No valid {schema.__name__} after {STRUCTURED_ATTEMPTS} attempts"
+        ) from error
+
+    async def _generate(self, prompt: str, route: Route, call: LLMCall) -> str:
+        call.dispatched()
         if self.use_mock:
             return self._mock_response(prompt)
 
-        response = await self.model.generate_content_async(prompt)
+        response = await self._model(route).generate_content_async(
+            prompt, generation_config=route.generation_config or None
+        )
+        call.add_usage(response.usage_metadata)
         return response.text
 
+    async def stream_response(
+        self, prompt: str, kind: str = "default", usage: dict = None, route=None
+    ):
+        """Yield the completion text chunk by chunk as Gemini produces it."""
+        route = router.route(route or kind)
+        call = LLMCall(kind, self.model_for(route.kind), route.kind)
+        admission = None
+        try:
+            admission = breaker.admit()
+            if self.use_mock:
+                text = await scheduler.submit(
+                    kind,
+                    lambda: self._upstream(
+                        kind, lambda: self._generate(prompt, route, call), admission
+                    ),
+                )
+                for i in range(0, len(text), 16):
+                    yield text[i : i + 16]
+                return
+
+            def open_stream():
+                call.dispatched()
+                return self._model(route).generate_content_async(
+                    prompt,
+                    stream=True,
+                    generation_config=route.generation_config or None,
+                )
+
+            # Only opening the stream is scheduled; the slot is freed once it starts.
+            response = await scheduler.submit(
+                kind, lambda: self._upstream(kind, open_stream, admission, hedge=False)
+            )
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+            call.add_usage(response.usage_metadata)
+        except BaseException as e:
+            call.failed(e)
+            raise
+        finally:
+            if admission is not None:
+                admission.release()
+            self._record(call, usage)
+
+    @property
+    def model_name(self) -> str:
+        return self.model_for("default")
+
+    def model_for(self, route: str) -> str:
+        """Name of the model `route` goes to, as used in cache keys and metrics."""
+        if self.use_mock:
+            return "mock"
+        model = router.route(route).model
+        return f"simulated-{model}" if self.simulated else model
+
     def apiKey(self):
         return self.settings.gemini_api_key
 
+    def _mock_structured(self, schema) -> str:
+        """Mock JSON for whichever response schema was requested"""
+        canned = {
+            "question": "Do you have body aches along with your fever?",
+            "is_final": False,
+            "diagnosis": "Common cold",
+            "confidence": "medium",
+            "recommendation": "self_care",
+            "advice": "Rest, drink fluids, and take over-the-counter medications as needed.",
+        }
+        return json.dumps({name: canned[name] for name in schema.model_fields})
+
     def _mock_response(self, prompt: str) -> str:
         """Mock responses for development/testing"""
         if "medical screening assistant" in prompt.lower():
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from collections import deque
+
+from .config import AISettings
+from .telemetry import percentile
+
+# Background work can wait; hedging it would only spend quota.
+UNHEDGED_KINDS = {"speculation", "batch"}
+
+
+class Hedger:
+    """
+    Tail-latency hedging for upstream calls.
+
+    If a call has not answered after the `percentile` latency recently seen
+    for its kind (never less than min_delay_ms), an identical second call
+    is started and whichever succeeds first wins; the other is cancelled.
+    Until `warmup` samples exist for a kind nothing is hedged, and at most
+    `budget` of all eligible calls are hedged so a slow API is not hit
+    twice as hard.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 0.95,
+        min_delay_ms: float = 250,
+        budget: float = 0.1,
+        warmup: int = 20,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.budget = budget
+        self.warmup = warmup
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "over_budget": 0,
+        }
+
+    def delay(self, kind: str):
+        """Seconds to wait before hedging a `kind` call, or None to not hedge."""
+        with self._lock:
+            values = sorted(self._latencies.get(kind, ()))
+        if len(values) < self.warmup:
+            return None
+        return max(percentile(values, self.percentile), self.min_delay_ms) / 1000
+
+    async def run(self, kind: str, make_coro):
+        if not self.enabled or kind in UNHEDGED_KINDS:
+            return await make_coro()
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._stats["calls"] += 1
+        delay = self.delay(kind)
+
+        started = loop.time()
+        first = loop.create_task(make_coro())
+        tasks = {first}
+        try:
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not first.done() and self._take_budget():
+                    tasks.add(loop.create_task(make_coro()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._finished(kind, task is not first, started, loop)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._stats["hedged"] + 1 > self.budget * self._stats["calls"]:
+                self._stats["over_budget"] += 1
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def _finished(self, kind: str, hedge_won: bool, started: float, loop):
+        # Winning hedges are not recorded: their latency excludes the wait
+        # before they started and would drag the delay estimate down.
+        with self._lock:
+            if hedge_won:
+                self._stats["hedge_wins"] += 1
+                return
+            window = self._latencies.setdefault(kind, deque(maxlen=512))
+            window.append((loop.time() - started) * 1000)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            kinds = list(self._latencies)
+        stats["enabled"] = self.enabled
+        stats["hedge_rate"] = (
+            stats["hedged"] / stats["calls"] if stats["calls"] else 0.0
+        )
+        stats["win_rate"] = (
+            stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        )
+        stats["delay_ms"] = {}
+        for kind in kinds:
+            delay = self.delay(kind)
+            stats["delay_ms"][kind] = round(delay * 1000, 1) if delay else None
+        return stats
+
+
+_settings = AISettings()
+hedger = Hedger(
+    enabled=_settings.llm_hedge_enabled,
+    percentile=_settings.llm_hedge_percentile,
+    min_delay_ms=_settings.llm_hedge_min_delay_ms,
+    budget=_settings.llm_hedge_budget,
+)
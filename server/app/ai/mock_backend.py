@@ -0,0 +1,176 @@
+"""
+An offline stand-in for genai.GenerativeModel with production-like timing.
+
+Enabled with USE_GPT_MOCK=sim. Unlike USE_GPT_MOCK=1, which returns canned
+JSON instantly, every call here waits for a latency drawn from the
+configured distribution, may fail with an injected 429/500/timeout, and
+reports simulated token counts, so load tests exercise the scheduler,
+retries and streaming the way real traffic does.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+from typing import Literal, get_args, get_origin
+
+from google.api_core import exceptions as google_exceptions
+
+_WORDS = (
+    "do you have any pain swelling fever cough nausea when you breathe walk "
+    "eat sleep or move has it lasted longer than a few days"
+).split()
+
+
+class UsageMetadata:
+    __slots__ = (
+        "prompt_token_count",
+        "candidates_token_count",
+        "total_token_count",
+    )
+
+    def __init__(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = completion_tokens
+        self.total_token_count = prompt_tokens + completion_tokens
+
+
+class SimulatedResponse:
+    def __init__(self, text: str, usage_metadata: UsageMetadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class SimulatedStream:
+    """Async iterable of chunks, like a streamed generate_content_async result."""
+
+    def __init__(self, model, tokens: list, prompt_tokens: int):
+        self._model = model
+        self._tokens = tokens
+        self.usage_metadata = UsageMetadata(prompt_tokens, len(tokens))
+
+    async def __aiter__(self):
+        step = 4
+        for i in range(0, len(self._tokens), step):
+            await asyncio.sleep(step / self._model.tokens_per_second)
+            yield SimulatedResponse(
+                " ".join(self._tokens[i : i + step]) + " ", self.usage_metadata
+            )
+
+    @property
+    def text(self):
+        return " ".join(self._tokens)
+
+
+class SimulatedModel:
+    def __init__(
+        self,
+        model_name: str = "simulated",
+        distribution: str = "lognormal",
+        latency_ms: float = 1500,
+        sigma: float = 0.5,
+        error_rate_429: float = 0.0,
+        error_rate_500: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_s: float = 30,
+        completion_tokens: int = 40,
+        tokens_per_second: float = 80,
+        seed=None,
+    ):
+        self.model_name = model_name
+        self.distribution = distribution
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate_429 = error_rate_429
+        self.error_rate_500 = error_rate_500
+        self.timeout_rate = timeout_rate
+        self.timeout_s = timeout_s
+        self.completion_tokens = completion_tokens
+        self.tokens_per_second = tokens_per_second
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_settings(cls, settings, model: str = None) -> "SimulatedModel":
+        return cls(
+            model_name=f"simulated-{model or settings.gemini_model}",
+            distribution=settings.mock_latency_distribution,
+            latency_ms=settings.mock_latency_ms,
+            sigma=settings.mock_latency_sigma,
+            error_rate_429=settings.mock_error_rate_429,
+            error_rate_500=settings.mock_error_rate_500,
+            timeout_rate=settings.mock_timeout_rate,
+            timeout_s=settings.mock_timeout_s,
+            completion_tokens=settings.mock_completion_tokens,
+            tokens_per_second=settings.mock_tokens_per_second,
+        )
+
+    def sample_latency(self) -> float:
+        """Seconds until the first token, drawn from the configured distribution."""
+        mean = self.latency_ms / 1000
+        if self.distribution == "fixed":
+            return mean
+        if self.distribution == "uniform":
+            return self._random.uniform(0, 2 * mean)
+        if self.distribution == "exponential":
+            return self._random.expovariate(1 / mean)
+        # lognormal with latency_ms as the median: a long right tail like real APIs.
+        return self._random.lognormvariate(0, self.sigma) * mean
+
+    async def generate_content_async(
+        self, contents, stream: bool = False, generation_config=None, **kwargs
+    ):
+        await asyncio.sleep(self.sample_latency())
+        await self._maybe_fail()
+
+        prompt_tokens = len(str(contents)) // 4 + 1
+        limit = self.completion_tokens
+        schema = None
+        if isinstance(generation_config, dict):
+            # The route's max_output_tokens is a cap, not the typical length.
+            cap = generation_config.get("max_output_tokens")
+            if cap:
+                limit = min(limit, cap)
+            schema = generation_config.get("response_schema")
+        tokens = self._completion(limit)
+
+        if stream and schema is None:
+            return SimulatedStream(self, tokens, prompt_tokens)
+
+        # Non-streamed calls also pay for generating the whole completion.
+        await asyncio.sleep(len(tokens) / self.tokens_per_second)
+        usage = UsageMetadata(prompt_tokens, len(tokens))
+        if schema is not None:
+            return SimulatedResponse(self._structured(schema, tokens), usage)
+        return SimulatedResponse(" ".join(tokens), usage)
+
+    async def _maybe_fail(self):
+        roll = self._random.random()
+        if roll < self.error_rate_429:
+            raise google_exceptions.ResourceExhausted("Simulated 429: quota exceeded")
+        roll -= self.error_rate_429
+        if roll < self.error_rate_500:
+            raise google_exceptions.InternalServerError("Simulated 500")
+        roll -= self.error_rate_500
+        if roll < self.timeout_rate:
+            await asyncio.sleep(self.timeout_s)
+            raise google_exceptions.DeadlineExceeded("Simulated timeout")
+
+    def _structured(self, schema, tokens: list) -> str:
+        """JSON for a pydantic response schema, built from the simulated words."""
+        data = {}
+        for name, field in schema.model_fields.items():
+            if field.annotation is bool:
+                data[name] = self._random.random() < 0.1
+            elif get_origin(field.annotation) is Literal:
+                data[name] = self._random.choice(get_args(field.annotation))
+            else:
+                data[name] = " ".join(tokens)
+        return json.dumps(data)
+
+    def _completion(self, limit: int) -> list:
+        # A unique prefix keeps simulated answers from colliding in caches.
+        count = max(1, int(self._random.uniform(0.5, 1.0) * limit))
+        words = [f"[sim-{next(self._ids)}]"]
+        words += [self._random.choice(_WORDS) for _ in range(count - 1)]
+        return words
@@ -0,0 +1,43 @@
+from .prompts import summary_prompt
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English prose; close enough for a budget.
+    return len(text) // 4 + 1
+
+
+def history_tokens(summary: str, pairs: list) -> int:
+    return estimate_tokens(summary) + estimate_tokens(str(dict(pairs)))
+
+
+def recent_history(state, paired: dict):
+    """
+    Split the interview into (summary, turns still sent verbatim) using the
+    summary already stored in the InterviewState. Never calls the LLM.
+    """
+    pairs = list(paired.items())
+    return state.summary, dict(pairs[state.summarized_turns :])
+
+
+def compact_history(state, paired: dict, summarize, budget: int, keep_recent: int):
+    """
+    Fold older turns into the rolling summary once the verbatim history goes
+    over budget. Only turns not yet summarized are sent to summarize(), with
+    the previous summary, so earlier turns are never summarized twice.
+
+    summarize(prompt) -> str performs the LLM call. Returns the same
+    (summary, recent turns) pair as recent_history().
+    """
+    summary, recent = recent_history(state, paired)
+    if budget <= 0 or history_tokens(summary, list(recent.items())) <= budget:
+        return summary, recent
+
+    pairs = list(recent.items())
+    split = max(len(pairs) - keep_recent, 0)
+    fold, keep = pairs[:split], pairs[split:]
+    if not fold:
+        return summary, recent
+
+    summary = summarize(summary_prompt(summary, dict(fold))).strip()
+    state.fold_summary(summary, len(fold))
+    return summary, dict(keep)
@@ -0,0 +1,88 @@
+# Bump whenever the wording below changes so cached responses built from an
+# older template are not served for the new one.
+PROMPT_VERSION = 3
+
+
+def initial_prompt(pain_points: str, answers: list, questions_asked: list) -> str:
+    return f"""
+    You are a medical assistant helping a user through a diagnostic flow.
+    
+    Please make the questions clear and concise.
+
+    Initial areas of concern: {pain_points}
+    Previous Answers: {answers}
+    Questions Already Asked: {questions_asked}
+
+    DO NOT ask a question that cannot be a yes or no answer, no question you ask can be multi-faceted in anyway. It must be a clear yes or no question.
+
+    """
+
+
+def _summary_line(summary: str) -> str:
+    if not summary:
+        return ""
+    return f"Summary of earlier questions and answers: {summary}\n    "
+
+
+def next_question_prompt(pain_points: str, paired: dict, summary: str = "") -> str:
+    return f"""
+    You are a medical assistant helping a user through a diagnostic flow. Your goal is to try and diagnos the patient based on a set of symptoms.
+    
+    
+    DO NOT reiterate previous questions in your answer, do not mention them.
+    
+    Please do not repeat a question that has already been asked.
+    Also please look for the next question that may best address the currently known set of questions and answers as well as initial pain points.
+    Initial areas of concern: {pain_points}
+    {_summary_line(summary)}Previously asked questions and answers of the form (question, answer): {paired}
+
+    DO NOT ask a question that cannot be a yes or no answer, no question you ask can be multi-faceted in anyway. It must be a clear yes or no question.
+    """
+
+
+def diagnosis_prompt(pain_points: str, paired: dict, summary: str = "") -> str:
+    return f"""
+    You are a clinical diagnostic assistant. The user has completed a guided diagnostic interview. Based on their initial symptoms and the complete set of questions and answers, your goal is to provide the most likely diagnosis (or a short list of likely conditions), along with a brief rationale for your assessment.
+
+    Be direct and medically focused. Include:
+    - A most likely condition (or top 3 possibilities if uncertain)
+    - A short clinical reasoning for the assessment
+    - Avoid asking further questions
+    - Do not repeat or restate the input
+
+    Initial areas of concern: {pain_points}
+
+    {_summary_line(summary)}Question and Answer History:
+    {paired}
+
+    Now, based on this data, what is the most probable diagnosis or set of diagnoses?
+    """
+
+
+def summary_prompt(previous_summary: str, paired: dict) -> str:
+    return f"""
+    You are condensing part of a medical screening interview so it can be carried forward in later prompts.
+
+    Existing summary: {previous_summary or "None"}
+    New questions and answers of the form (question, answer): {paired}
+
+    Rewrite the existing summary so it also covers the new questions and answers. Keep every clinically relevant positive and negative finding, drop the wording of the questions, and answer in a few short sentences.
+    """
+
+
+# Appended in structured-output mode, where Gemini must fill a JSON schema.
+STRUCTURED_INSTRUCTIONS = {
+    "initial": """
+    Respond in JSON. Put only the question itself in "question", set "is_final" to false and leave "diagnosis", "confidence", "recommendation" and "advice" empty.
+    """,
+    "next": """
+    Respond in JSON. Put only the question itself in "question". Set "is_final" to true only once the answers so far are enough to diagnose the patient; in that case fill in "diagnosis", "confidence" (high, medium or low), "recommendation" (self_care or see_doctor) and "advice". Otherwise leave those four fields empty.
+    """,
+    "diagnosis": """
+    Respond in JSON with the most likely condition in "diagnosis", your "confidence" and a "recommendation", and put the clinical reasoning and next steps in "advice".
+    """,
+}
+
+
+def structured_prompt(kind: str, prompt: str) -> str:
+    return prompt + STRUCTURED_INSTRUCTIONS[kind]
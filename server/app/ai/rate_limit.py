@@ -0,0 +1,54 @@
+import asyncio
+import random
+from time import monotonic
+
+from google.api_core import exceptions as google_exceptions
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def refund(self, tokens: float = 1):
+        """Give back tokens that were acquired but not used."""
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429s, 5xx responses and timeouts are worth another attempt."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    if isinstance(exc, google_exceptions.GoogleAPICallError):
+        code = exc.code or 0
+        return code == 429 or code >= 500
+    return False
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 20.0) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import re
+
+from ..utils.ttl_cache import TTLCache
+from .config import AISettings
+from .prompts import PROMPT_VERSION
+
+BYPASS_HEADER = "X-Cache-Bypass"
+
+_whitespace = re.compile(r"\s+")
+
+
+class ResponseCache(TTLCache):
+    """LLM responses by interview_cache_key, each kept for `ttl` seconds."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600):
+        super().__init__(max_entries, ttl)
+
+
+def _normalize(text) -> str:
+    return _whitespace.sub(" ", str(text)).strip().lower()
+
+
+def interview_cache_key(kind: str, pain_points: str, paired: dict, model: str) -> str:
+    """Canonical key for an interview state, independent of formatting noise."""
+    points = sorted({_normalize(p) for p in pain_points.split(",") if p.strip()})
+    turns = [[_normalize(q), _normalize(a)] for q, a in paired.items()]
+    raw = json.dumps(
+        [PROMPT_VERSION, model, kind, points, turns], separators=(",", ":")
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_bypassed(headers) -> bool:
+    if headers.get(BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in headers.get("Cache-Control", "").lower()
+
+
+_settings = AISettings()
+response_cache = ResponseCache(
+    max_entries=_settings.response_cache_size, ttl=_settings.response_cache_ttl
+)
@@ -0,0 +1,56 @@
+from .config import AISettings
+
+# Generation settings a route may override; anything else is a config typo.
+GENERATION_KEYS = {
+    "max_output_tokens",
+    "temperature",
+    "top_p",
+    "top_k",
+    "stop_sequences",
+}
+
+
+class Route:
+    __slots__ = ("kind", "model", "generation_config")
+
+    def __init__(self, kind: str, model: str, generation_config: dict):
+        self.kind = kind
+        self.model = model
+        self.generation_config = generation_config
+
+
+class ModelRouter:
+    """
+    Picks the model and generation config for each prompt kind (initial,
+    next, diagnosis, summarization). Kinds without a route, and routes
+    without a "model", use the default model with its default config.
+    """
+
+    def __init__(self, default_model: str, routes: dict):
+        self.default_model = default_model
+        self._routes = {}
+        for kind, config in routes.items():
+            config = dict(config)
+            model = config.pop("model", None) or default_model
+            unknown = set(config) - GENERATION_KEYS
+            if unknown:
+                raise ValueError(
+                    f"Unknown generation settings for {kind}: {sorted(unknown)}"
+                )
+            self._routes[kind] = Route(kind, model, config)
+
+    def route(self, kind: str) -> Route:
+        route = self._routes.get(kind)
+        if route is None:
+            return Route(kind, self.default_model, {})
+        return route
+
+    def stats(self) -> dict:
+        return {
+            kind: {"model": route.model, **route.generation_config}
+            for kind, route in self._routes.items()
+        }
+
+
+_settings = AISettings()
+router = ModelRouter(_settings.gemini_model, _settings.llm_routes)
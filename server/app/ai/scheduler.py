@@ -0,0 +1,271 @@
+import asyncio
+import heapq
+import itertools
+import threading
+from collections import deque
+
+from .config import AISettings
+from .event_loop import current_loop
+from .rate_limit import TokenBucket, backoff_delay, is_retryable
+
+# Lower runs first. A failed diagnosis at the end of an interview costs the
+# user the most, background work the least.
+PRIORITIES = {
+    "diagnosis": 0,
+    "next": 1,
+    "initial": 2,
+    "summarization": 2,
+    "default": 2,
+    "speculation": 3,
+    "batch": 4,
+}
+
+
+class SchedulerOverloaded(Exception):
+    """The LLM queue cannot take this call right now."""
+
+
+class QueueFull(SchedulerOverloaded):
+    pass
+
+
+class DeadlineExceeded(SchedulerOverloaded):
+    pass
+
+
+class _Entry:
+    __slots__ = (
+        "kind",
+        "priority",
+        "make_coro",
+        "future",
+        "enqueued",
+        "timer",
+        "task",
+        "max_retries",
+    )
+
+    def __init__(self, kind, priority, make_coro, future, enqueued, max_retries):
+        self.kind = kind
+        self.priority = priority
+        self.make_coro = make_coro
+        self.future = future
+        self.enqueued = enqueued
+        self.timer = None
+        self.task = None
+        self.max_retries = max_retries
+
+
+class LLMScheduler:
+    """
+    Central admission point for Gemini calls on the per-worker loop.
+
+    Calls wait in a bounded priority queue, start no faster than the token
+    bucket allows and no more than max_concurrency at a time, give up once
+    their queue deadline passes, and retry 429/5xx responses with jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0,
+        burst: float = None,
+        max_concurrency: int = 32,
+        max_queue: int = 256,
+        deadline: float = 30,
+        max_retries: int = 2,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.max_retries = max_retries
+
+        self._loop = None
+        self._queue = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._waits = {kind: deque(maxlen=1024) for kind in PRIORITIES}
+        self._stats = {
+            "submitted": 0,
+            "rejected_full": 0,
+            "evicted": 0,
+            "expired": 0,
+            "retries": 0,
+            "in_flight": 0,
+            "unscheduled": 0,
+        }
+
+    async def submit(
+        self, kind: str, make_coro, deadline: float = None, max_retries: int = None
+    ):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if loop is not current_loop():
+                # Only the per-worker loop is scheduled; per_request mode and
+                # the batch CLI run on short-lived loops of their own.
+                with self._lock:
+                    self._stats["unscheduled"] += 1
+                return await make_coro()
+            # First call on this worker's loop, or a new loop after a fork.
+            self._bind(loop)
+
+        priority = PRIORITIES.get(kind, PRIORITIES["default"])
+        if max_retries is None:
+            max_retries = self.max_retries
+        entry = _Entry(
+            kind, priority, make_coro, loop.create_future(), loop.time(), max_retries
+        )
+        self._enqueue(entry)
+
+        entry.timer = loop.call_later(
+            self.deadline if deadline is None else deadline, self._expire, entry
+        )
+        entry.future.add_done_callback(lambda _: self._cancel_task(entry))
+        return await entry.future
+
+    def stats(self) -> dict:
+        # Imported here as telemetry itself imports this module.
+        from .telemetry import percentile
+
+        with self._lock:
+            stats = dict(self._stats)
+            depth = {}
+            for _, _, entry in self._queue:
+                if not entry.future.done():
+                    depth[entry.kind] = depth.get(entry.kind, 0) + 1
+            waits = {kind: sorted(w) for kind, w in self._waits.items() if w}
+
+        stats["queue_depth"] = sum(depth.values())
+        stats["queue_depth_by_kind"] = depth
+        stats["wait_ms"] = {
+            kind: {
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": values[-1],
+            }
+            for kind, values in waits.items()
+        }
+        stats["rate_limit"] = self.rate
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+    def _bind(self, loop):
+        self._loop = loop
+        with self._lock:
+            self._queue = []
+            self._stats["in_flight"] = 0
+        self._bucket = TokenBucket(self.rate, self.burst)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._has_work = asyncio.Event()
+        loop.create_task(self._dispatch())
+
+    def _enqueue(self, entry: _Entry):
+        with self._lock:
+            self._stats["submitted"] += 1
+            live = [item for item in self._queue if not item[2].future.done()]
+            if len(live) != len(self._queue):
+                heapq.heapify(live)
+                self._queue = live
+
+            if len(self._queue) >= self.max_queue:
+                worst = max(self._queue, key=lambda item: (item[0], item[1]))
+                if worst[0] <= entry.priority:
+                    self._stats["rejected_full"] += 1
+                    raise QueueFull("LLM queue is full")
+                # Make room for more important work by dropping the least
+                # important, most recently queued call.
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                self._stats["evicted"] += 1
+                worst[2].future.set_exception(
+                    QueueFull("Evicted by a higher priority call")
+                )
+
+            heapq.heappush(self._queue, (entry.priority, next(self._seq), entry))
+        self._has_work.set()
+
+    def _next_entry(self):
+        with self._lock:
+            while self._queue:
+                _, _, entry = heapq.heappop(self._queue)
+                if not entry.future.done():
+                    return entry
+        return None
+
+    async def _dispatch(self):
+        while True:
+            if not self._queue:
+                self._has_work.clear()
+                await self._has_work.wait()
+                continue
+
+            await self._slots.acquire()
+            await self._bucket.acquire()
+
+            # Pick after waiting so a call that arrived meanwhile can jump ahead.
+            entry = self._next_entry()
+            if entry is None:
+                self._slots.release()
+                self._bucket.refund()
+                continue
+
+            entry.timer.cancel()
+            wait_ms = round((self._loop.time() - entry.enqueued) * 1000, 1)
+            waits = self._waits.get(entry.kind, self._waits["default"])
+            with self._lock:
+                waits.append(wait_ms)
+                self._stats["in_flight"] += 1
+            entry.task = self._loop.create_task(self._run(entry))
+            entry.task.add_done_callback(self._finished)
+
+    async def _run(self, entry: _Entry):
+        attempt = 0
+        while True:
+            try:
+                result = await entry.make_coro()
+            except Exception as e:
+                if attempt < entry.max_retries and is_retryable(e):
+                    with self._lock:
+                        self._stats["retries"] += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    await self._bucket.acquire()
+                    continue
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+                return
+            if not entry.future.done():
+                entry.future.set_result(result)
+            return
+
+    def _finished(self, task):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        self._slots.release()
+
+    def _expire(self, entry: _Entry):
+        if entry.task is None and not entry.future.done():
+            with self._lock:
+                self._stats["expired"] += 1
+            entry.future.set_exception(
+                DeadlineExceeded(f"{entry.kind} call waited too long for an LLM slot")
+            )
+
+    def _cancel_task(self, entry: _Entry):
+        if entry.timer is not None:
+            entry.timer.cancel()
+        if entry.future.cancelled() and entry.task is not None:
+            entry.task.cancel()
+
+
+_settings = AISettings()
+scheduler = LLMScheduler(
+    rate=_settings.llm_rate_limit,
+    burst=_settings.llm_rate_burst or None,
+    max_concurrency=_settings.llm_max_concurrency,
+    max_queue=_settings.llm_queue_size,
+    deadline=_settings.llm_queue_deadline,
+    max_retries=_settings.llm_max_retries,
+)
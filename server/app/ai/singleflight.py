@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import re
+import threading
+
+_whitespace = re.compile(r"\s+")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one upstream request.
+
+    Callers with the same key await one shared task. Each waiter is shielded,
+    so one cancelled caller does not cancel the call for the others; the
+    shared task is only cancelled once every waiter has gone. Exceptions
+    reach every waiter, and nothing is remembered once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "deduplicated": 0, "abandoned": 0}
+
+    async def do(self, key: str, make_coro):
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            call = self._calls.get(key)
+            # Tasks cannot be awaited across loops (LLM_EXECUTION_MODE=per_request).
+            if call is not None and call["task"].get_loop() is loop:
+                call["waiters"] += 1
+                self._stats["deduplicated"] += 1
+            else:
+                task = loop.create_task(make_coro())
+                call = {"task": task, "waiters": 1}
+                self._calls[key] = call
+                self._stats["leaders"] += 1
+                task.add_done_callback(lambda t, key=key: self._forget(key, t))
+
+        task = call["task"]
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                call["waiters"] -= 1
+                orphaned = call["waiters"] == 0 and not task.done()
+                if orphaned:
+                    self._stats["abandoned"] += 1
+                    # Late callers must not join a call that is being cancelled.
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+            if orphaned:
+                task.cancel()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        total = stats["leaders"] + stats["deduplicated"]
+        stats["dedup_ratio"] = stats["deduplicated"] / total if total else 0.0
+        return stats
+
+    def _forget(self, key: str, task):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call["task"] is task:
+                del self._calls[key]
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    canonical = _whitespace.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{model}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+inflight = SingleFlight()
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeout
+from time import monotonic
+
+from .config import AISettings
+from .event_loop import get_loop_runner
+
+# Every follow-up the /next flow asks is yes/no, so these are the only branches.
+BRANCHES = ("yes", "no")
+
+
+class Speculator:
+    """
+    Precomputes the next question for every possible answer while the user
+    is still reading the current one.
+
+    Pending branches are futures on the per-worker loop, so they live in this
+    process keyed by session id rather than in the (serializable) session.
+    """
+
+    def __init__(self, max_in_flight: int = 8, ttl: float = 60, max_wait: float = 1):
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "launched": 0,
+            "skipped_at_capacity": 0,
+            "hits": 0,
+            "misses": 0,
+            "cancelled": 0,
+            "wasted": 0,
+            "expired": 0,
+            "timed_out": 0,
+        }
+
+    def launch(self, session_id: str, branches: dict):
+        """branches maps each possible answer to a zero-arg coroutine factory."""
+        self.discard(session_id)
+        runner = get_loop_runner()
+
+        futures = {}
+        for answer, make_coro in branches.items():
+            if not self._slots.acquire(blocking=False):
+                self._count("skipped_at_capacity")
+                continue
+            future = runner.submit(make_coro())
+            future.add_done_callback(lambda _: self._slots.release())
+            futures[answer] = future
+            self._count("launched")
+
+        if futures:
+            with self._lock:
+                self._pending[session_id] = (monotonic() + self.ttl, futures)
+        self._purge_expired()
+
+    def take(self, session_id: str, answer: str):
+        """
+        Return the precomputed response for answer, or None on a miss.
+
+        Branches are scheduled at the lowest priority, so one that has not
+        finished may still be queued behind other work; rather than holding
+        the request for it, give it at most max_wait seconds and then cancel
+        it so the caller asks again at its own priority.
+        """
+        with self._lock:
+            entry = self._pending.pop(session_id, None)
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        expires_at, futures = entry
+        future = futures.pop(_normalize(answer), None)
+        self._drop(futures)
+
+        if future is None or expires_at <= monotonic():
+            if future is not None:
+                self._drop({answer: future})
+                self._count("expired")
+            self._count("misses")
+            return None
+
+        try:
+            response = future.result(
+                timeout=max(min(expires_at - monotonic(), self.max_wait), 0)
+            )
+        except FutureTimeout:
+            future.cancel()
+            self._count("timed_out")
+            self._count("misses")
+            return None
+        except Exception:
+            future.cancel()
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return response
+
+    def discard(self, session_id: str):
+        with self._lock:
+            entry = self._pending.pop(session_id, None)
+        if entry is not None:
+            self._drop(entry[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_sessions"] = len(self._pending)
+        answered = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / answered if answered else 0.0
+        # Every launched branch costs an LLM call; only hits replace one.
+        stats["extra_llm_calls"] = stats["launched"] - stats["hits"]
+        stats["max_in_flight"] = self.max_in_flight
+        return stats
+
+    def _drop(self, futures: dict):
+        for future in futures.values():
+            if future.cancel():
+                self._count("cancelled")
+            elif not future.cancelled():
+                self._count("wasted")
+
+    def _purge_expired(self):
+        now = monotonic()
+        expired = []
+        with self._lock:
+            # Entries are appended in launch order with a fixed TTL, so the
+            # oldest ones are always at the front.
+            while self._pending:
+                session_id, (expires_at, futures) = next(iter(self._pending.items()))
+                if expires_at > now:
+                    break
+                del self._pending[session_id]
+                expired.append(futures)
+        for futures in expired:
+            self._count("expired")
+            self._drop(futures)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _normalize(answer: str) -> str:
+    return str(answer).strip().lower()
+
+
+_settings = AISettings()
+speculation_enabled = _settings.speculation_enabled
+speculator = Speculator(
+    max_in_flight=_settings.speculation_max_in_flight,
+    ttl=_settings.speculation_ttl,
+    max_wait=_settings.speculation_max_wait,
+)
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import monotonic
+
+from .circuit_breaker import CircuitOpen
+from .scheduler import SchedulerOverloaded
+
+# Upper bounds in ms of the latency histogram buckets; the last one is +Inf.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LLMCall:
+    """
+    One generate/stream call as seen by its caller.
+
+    queue_ms is the time until the scheduler first ran the call. Callers that
+    joined another caller's identical request (single-flight) are never
+    dispatched themselves, so they report no queue time and no tokens.
+    """
+
+    __slots__ = (
+        "kind",
+        "model",
+        "route",
+        "started",
+        "queue_ms",
+        "wall_ms",
+        "attempts",
+        "prompt_tokens",
+        "completion_tokens",
+        "outcome",
+    )
+
+    def __init__(self, kind: str, model: str, route: str = None):
+        self.kind = kind
+        self.model = model
+        self.route = route or kind
+        self.started = monotonic()
+        self.queue_ms = None
+        self.wall_ms = None
+        self.attempts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.outcome = "ok"
+
+    def dispatched(self):
+        self.attempts += 1
+        if self.queue_ms is None:
+            self.queue_ms = round((monotonic() - self.started) * 1000, 1)
+
+    def add_usage(self, usage_metadata):
+        if usage_metadata is None:
+            return
+        self.prompt_tokens += getattr(usage_metadata, "prompt_token_count", 0) or 0
+        self.completion_tokens += (
+            getattr(usage_metadata, "candidates_token_count", 0) or 0
+        )
+
+    def failed(self, exc: BaseException):
+        if isinstance(exc, (asyncio.CancelledError, GeneratorExit)):
+            self.outcome = "cancelled"
+        elif isinstance(exc, CircuitOpen):
+            self.outcome = "circuit_open"
+        elif isinstance(exc, SchedulerOverloaded):
+            self.outcome = "overloaded"
+        else:
+            self.outcome = "error"
+
+    def finish(self):
+        self.wall_ms = round((monotonic() - self.started) * 1000, 1)
+        if self.outcome == "ok" and self.attempts == 0:
+            self.outcome = "shared"
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 2048):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value_ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.samples.append(value_ms)
+
+    def to_dict(self) -> dict:
+        values = sorted(self.samples)
+        # [upper bound, cumulative count] pairs; a list keeps them in order in JSON.
+        buckets = []
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + ("+Inf",), self.counts):
+            running += count
+            buckets.append([bound, running])
+        return {
+            "count": self.total,
+            "mean": round(self.sum_ms / self.total, 1) if self.total else None,
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "buckets": buckets,
+        }
+
+
+class LLMTelemetry:
+    """Aggregates finished LLM calls by kind and completed interviews."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kinds = {}
+        self._routes = {}
+        self._interviews = {
+            "tokens": deque(maxlen=2048),
+            "llm_ms": deque(maxlen=2048),
+            "calls": deque(maxlen=2048),
+        }
+        self._completed = 0
+
+    def record(self, call: LLMCall):
+        with self._lock:
+            kind = self._kinds.get(call.kind)
+            if kind is None:
+                kind = self._kinds[call.kind] = {
+                    "wall": LatencyHistogram(),
+                    "queue": LatencyHistogram(),
+                    "outcomes": {},
+                    "models": {},
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                }
+            kind["wall"].observe(call.wall_ms)
+            if call.queue_ms is not None:
+                kind["queue"].observe(call.queue_ms)
+            kind["outcomes"][call.outcome] = kind["outcomes"].get(call.outcome, 0) + 1
+            kind["models"][call.model] = kind["models"].get(call.model, 0) + 1
+            kind["prompt_tokens"] += call.prompt_tokens
+            kind["completion_tokens"] += call.completion_tokens
+            models = self._routes.setdefault(call.route, {})
+            models[call.model] = models.get(call.model, 0) + 1
+
+    def record_interview(self, usage: dict):
+        """Called once per finished interview with its session totals."""
+        with self._lock:
+            self._completed += 1
+            self._interviews["tokens"].append(
+                usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+            )
+            self._interviews["llm_ms"].append(usage.get("wall_ms", 0))
+            self._interviews["calls"].append(usage.get("calls", 0))
+
+    def route_counts(self) -> dict:
+        """Calls per route and the model each was sent to."""
+        with self._lock:
+            return {route: dict(models) for route, models in self._routes.items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {
+                name: {
+                    "latency_ms": kind["wall"].to_dict(),
+                    "queue_ms": kind["queue"].to_dict(),
+                    "outcomes": dict(kind["outcomes"]),
+                    "models": dict(kind["models"]),
+                    "prompt_tokens": kind["prompt_tokens"],
+                    "completion_tokens": kind["completion_tokens"],
+                }
+                for name, kind in self._kinds.items()
+            }
+            interviews = {
+                name: sorted(values) for name, values in self._interviews.items()
+            }
+            completed = self._completed
+
+        return {
+            "by_kind": kinds,
+            "interviews": {
+                "completed": completed,
+                **{
+                    f"{name}_per_interview": {
+                        "mean": (
+                            round(sum(values) / len(values), 1) if values else None
+                        ),
+                        "p50": percentile(values, 0.50),
+                        "p95": percentile(values, 0.95),
+                        "p99": percentile(values, 0.99),
+                    }
+                    for name, values in interviews.items()
+                },
+            },
+        }
+
+
+def add_to_usage(usage: dict, call: LLMCall):
+    """Fold a finished call into per-session totals (InterviewState.usage)."""
+    usage["calls"] = usage.get("calls", 0) + 1
+    usage["wall_ms"] = round(usage.get("wall_ms", 0) + call.wall_ms, 1)
+    usage["queue_ms"] = round(usage.get("queue_ms", 0) + (call.queue_ms or 0), 1)
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + call.prompt_tokens
+    usage["completion_tokens"] = (
+        usage.get("completion_tokens", 0) + call.completion_tokens
+    )
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    return values[min(int(p * len(values)), len(values) - 1)]
+
+
+telemetry = LLMTelemetry()
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime
+from time import monotonic, sleep
+
+from sqlalchemy import delete, select
+
+from app.database.database import SessionLocal
+from app.database.models import RevokedToken
+from app.settings import settings
+from app.utils.per_process import PerProcess, daemon_thread
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings, sized for `capacity` items at
+    `error_rate` false positives. The k bit positions come from one blake2b
+    digest by double hashing. "Not present" is always right; "present" is
+    wrong at most about error_rate of the time.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % size
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        # Positions are generated lazily: most absent items miss on the first.
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti) for this worker.
+
+    Every validated token is checked against a Bloom filter of the revoked
+    ids, so the usual "not revoked" answer needs no I/O. Only a filter hit
+    is confirmed against the revoked_tokens table. The filter is rebuilt
+    from the table every `refresh_interval` seconds by a background thread,
+    which also purges rows past their expiry; tokens revoked by another
+    worker are therefore honoured here within one interval, and revocations
+    made by this worker immediately. If a rebuild fails the previous filter
+    is kept and the next interval retries.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        refresh_interval: float = 30,
+        session_factory=SessionLocal,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self._session_factory = session_factory
+        self._filter = None
+        self._lock = threading.Lock()
+        self._refresher = PerProcess(self._start_refresher)
+        # jti -> when this worker revoked it, until a rebuild has seen it.
+        self._recent = {}
+        self._stats = {
+            "checks": 0,
+            "filter_negatives": 0,
+            "db_checks": 0,
+            "false_positives": 0,
+            "revoked_hits": 0,
+            "unchecked": 0,
+            "revoked": 0,
+            "rebuilds": 0,
+            "rebuild_failures": 0,
+            "last_rebuild_ms": None,
+        }
+
+    def is_revoked(self, jti: str) -> bool:
+        if not jti:
+            # Tokens issued before jti existed cannot be revoked.
+            return False
+        if self._ensure_refresher():
+            # First check in this worker: load the filter before answering.
+            self.rebuild()
+        bloom = self._filter
+        if bloom is None:
+            # The table could not be read yet; the refresher keeps trying.
+            self._count("checks", "unchecked")
+            return False
+        if jti not in bloom:
+            self._count("checks", "filter_negatives")
+            return False
+
+        self._count("checks", "db_checks")
+        db = self._session_factory()
+        try:
+            revoked = db.get(RevokedToken, jti) is not None
+        except Exception:
+            # Almost every filter hit is a real revocation; refuse the token.
+            logger.exception("Checking revoked token %s failed", jti)
+            return True
+        finally:
+            db.close()
+        self._count("revoked_hits" if revoked else "false_positives")
+        return revoked
+
+    def revoke(self, jti: str, user_id: int, expires_at: datetime):
+        db = self._session_factory()
+        try:
+            db.merge(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self._recent[jti] = monotonic()
+            if self._filter is not None:
+                self._filter.add(jti)
+            self._stats["revoked"] += 1
+
+    def rebuild(self):
+        """Reload the filter from the table; on failure keep the current one."""
+        start = monotonic()
+        now = datetime.utcnow()
+        db = self._session_factory()
+        try:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.commit()
+            jtis = db.scalars(
+                select(RevokedToken.jti).where(RevokedToken.expires_at > now)
+            ).all()
+        except Exception:
+            db.rollback()
+            logger.exception("Rebuilding the token revocation filter failed")
+            self._count("rebuild_failures")
+            return self._filter
+        finally:
+            db.close()
+
+        # Sized with headroom so revocations made before the next rebuild do
+        # not push the false positive rate up.
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            # Revocations committed after the table was read are not in it.
+            for jti, revoked_at in list(self._recent.items()):
+                if revoked_at >= start:
+                    bloom.add(jti)
+                else:
+                    del self._recent[jti]
+            self._filter = bloom
+            self._stats["rebuilds"] += 1
+            self._stats["last_rebuild_ms"] = round((monotonic() - start) * 1000, 1)
+        return bloom
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            bloom = self._filter
+        stats["filter_items"] = bloom.count if bloom else 0
+        stats["filter_bytes"] = len(bloom.bits) if bloom else 0
+        stats["filter_hashes"] = bloom.hashes if bloom else 0
+        stats["refresh_interval_s"] = self.refresh_interval
+        return stats
+
+    def _count(self, *names: str):
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+    def _ensure_refresher(self) -> bool:
+        """Start this worker's refresher; True only for the call that did."""
+        return self._refresher.ensure()[1]
+
+    def _start_refresher(self):
+        if self.refresh_interval > 0:
+            return daemon_thread(self._refresh_forever, "revocation-refresher")
+
+    def _refresh_forever(self):
+        while True:
+            sleep(self.refresh_interval)
+            self.rebuild()
+
+
+revocation_list = RevocationList(
+    capacity=settings.revocation_filter_capacity,
+    error_rate=settings.revocation_filter_error_rate,
+    refresh_interval=settings.revocation_refresh_interval,
+)
@@ -1,32 +1,62 @@
+import logging
 from datetime import datetime, timedelta
+from uuid import uuid4
 from sqlalchemy.orm import Session
 
 from ..crud.users import UserCrud
-from ..utils.hashing import verify_password
+from ..utils.hashing import upgraded_hash, verify_password
 from ..database.models import User
 from ..settings import settings
 from ..utils.jwt_handler import create_token, validate_access_token
+from .revocation import revocation_list
+
+logger = logging.getLogger(__name__)
 
 
 def auth(user_crud: UserCrud, email: str, password: str):
     user = user_crud.get_user(email=email)
     if user and verify_password(password=password, hashed_password=user.hashedPassword):
-        access_payload = _auth_payload(user, timedelta(minutes=30))
-        refresh_payload = _auth_payload(user, timedelta(days=1))
-        return {
-            "access-token": create_token(access_payload),
-            "refresh-token": create_token(refresh_payload),
-            "token-type": "bearer",
-        }
+        _upgrade_password_hash(user_crud, user, password)
+        return _issue_tokens(user_crud, user)
     return False
 
 
-def _auth_payload(user: User, expiration_delta: timedelta):
+def _issue_tokens(user_crud: UserCrud, user: User):
+    # Only the short-lived access token carries role claims, so a role change
+    # reaches authorization checks within access_token_minutes. Refresh tokens
+    # have none; roles_required looks those up in the database.
+    roles = user_crud.roles(user_id=user.id)
+    claims = {"roles": roles["roles"], "clinics": roles["clinics"]}
+    access_payload = _auth_payload(
+        user, timedelta(minutes=settings.access_token_minutes), claims
+    )
+    refresh_payload = _auth_payload(user, timedelta(days=1))
+    return {
+        "access-token": create_token(access_payload),
+        "refresh-token": create_token(refresh_payload),
+        "token-type": "bearer",
+    }
+
+
+def _upgrade_password_hash(user_crud: UserCrud, user: User, password: str):
+    hashed = upgraded_hash(password, user.hashedPassword)
+    if hashed is None:
+        return
+    try:
+        user_crud.set_password_hash(user=user, hashed_password=hashed)
+    except Exception:
+        # The old hash still works; try again at the next login.
+        logger.exception("Could not upgrade password hash for user %s", user.id)
+
+
+def _auth_payload(user: User, expiration_delta: timedelta, claims: dict = None):
     return {
         "sub": str(user.id),
         "iss": settings.issuer,
         "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + expiration_delta,
+        "jti": uuid4().hex,
+        **(claims or {}),
     }
 
 
@@ -43,10 +73,20 @@ def refresh_token(user_crud: UserCrud, token: str):
     if not user:
         return False
 
-    access_payload = _auth_payload(user, timedelta(minutes=30))
-    refresh_payload = _auth_payload(user, timedelta(days=1))
-    return {
-        "access-token": create_token(access_payload),
-        "refresh-token": create_token(refresh_payload),
-        "token-type": "bearer",
-    }
+    return _issue_tokens(user_crud, user)
+
+
+def revoke_tokens(*payloads: dict) -> int:
+    """Revoke validated tokens before they expire; returns how many were."""
+    revoked = 0
+    for payload in payloads:
+        # Tokens issued before jti was added cannot be revoked individually.
+        if not payload.get("jti"):
+            continue
+        revocation_list.revoke(
+            payload["jti"],
+            int(payload["sub"]),
+            datetime.utcfromtimestamp(payload["exp"]),
+        )
+        revoked += 1
+    return revoked
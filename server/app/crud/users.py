@@ -1,15 +1,15 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.utils.hashing import hash_password
-from app.database.models import User, Doctor, Patient
-from app.crud.doctors import DoctorCrud
-from app.crud.patients import PatientCrud
+from app.database.models import User, Doctor, Patient, ClinicMembership
 
 
 class UserCrud:
     def __init__(self, db: Session):
         self.db = db
+        self._roles = {}
 
     def get_user(self, **kwargs):
         user = self.db.query(User).filter_by(**kwargs).first()
@@ -29,16 +29,65 @@ class UserCrud:
 
         return db_user
 
+    def set_password_hash(self, *, user: User, hashed_password: str):
+        user.hashedPassword = hashed_password
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
     def userRole(self, *, user: User) -> str:
         if not user:
             raise ValueError("Missing user")
+        return self.roles(user_id=user.id)["role"]
+
+    def roles(self, *, user_id: int) -> dict:
+        """
+        Everything authorization needs about a user, from one joined query:
+        "roles" (global role, "doctor", "patient"), "role" (the one userRole
+        reports) and "clinics" ({clinic id: [membership roles]}). Kept for
+        the life of this UserCrud, i.e. one request.
+        """
+        if user_id in self._roles:
+            return self._roles[user_id]
 
-        if user.global_role:
-            return user.global_role
+        rows = self.db.execute(
+            select(
+                User.global_role,
+                Doctor.id,
+                Patient.id,
+                ClinicMembership.clinic_id,
+                ClinicMembership.role,
+            )
+            .select_from(User)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .outerjoin(ClinicMembership, ClinicMembership.user_id == User.id)
+            .where(User.id == user_id)
+        ).all()
 
-        if DoctorCrud(self.db).isDoctor(user_id=user.id):
-            return "doctor"
-        if PatientCrud(self.db).isPatient(user_id=user.id):
-            return "patient"
+        roles = set()
+        clinics = {}
+        for global_role, doctor_id, patient_id, clinic_id, clinic_role in rows:
+            if global_role:
+                roles.add(global_role)
+            if doctor_id is not None:
+                roles.add("doctor")
+            if patient_id is not None:
+                roles.add("patient")
+            if clinic_id is not None:
+                members = clinics.setdefault(str(clinic_id), [])
+                if clinic_role not in members:
+                    members.append(clinic_role)
 
-        return "unknown"
+        global_role = rows[0][0] if rows else None
+        role = global_role or next(
+            (name for name in ("doctor", "patient") if name in roles), "unknown"
+        )
+        result = self._roles[user_id] = {
+            "roles": sorted(roles),
+            "role": role,
+            "clinics": clinics,
+        }
+        return result
@@ -0,0 +1,213 @@
+import atexit
+import logging
+import queue
+import threading
+from time import monotonic, sleep
+
+from sqlalchemy import insert, select
+
+from app.database.database import SessionLocal
+from app.database.models import Diagnosis, Patient
+from app.settings import settings
+from app.utils.per_process import PerProcess, daemon_thread
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DiagnosisWriter:
+    """
+    Write-behind persistence of completed interviews.
+
+    submit() only puts the row on an in-process queue, so the request never
+    waits on the database. A background thread takes up to `batch_size`
+    rows at a time (waiting at most `flush_interval` seconds to fill a
+    batch), resolves user ids to patient ids with one query and inserts the
+    batch with a single executemany. Failed batches are retried a few times
+    before they are dropped and counted. The queue is drained on interpreter
+    exit.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        max_retries: int = 3,
+        session_factory=SessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._session_factory = session_factory
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = PerProcess(lambda: daemon_thread(self._run, "diagnosis-writer"))
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed": 0,
+            "dropped_queue_full": 0,
+            "skipped_no_patient": 0,
+            "last_lag_ms": None,
+            "max_lag_ms": 0,
+        }
+
+    def submit(self, *, user_id: int, symptoms: list, qa_pairs: list, predicted: str):
+        self._ensure_started()
+        row = {
+            "user_id": user_id,
+            "symptoms": symptoms,
+            "qa_pairs": qa_pairs,
+            "predicted_diagnosis": predicted[:255],
+        }
+        try:
+            self._queue.put_nowait((monotonic(), row))
+        except queue.Full:
+            self._count("dropped_queue_full")
+            logger.warning("Diagnosis queue full, dropping result for user %s", user_id)
+            return
+        self._count("enqueued")
+
+    def stop(self, timeout: float = 10):
+        """Write everything still queued, then stop the worker thread."""
+        thread = self._worker.reset()
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Diagnosis queue still full at shutdown")
+            return
+        thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["oldest_pending_ms"] = self._oldest_pending_ms()
+        return stats
+
+    def _ensure_started(self):
+        self._worker.get()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _next_batch(self):
+        """Block for the first row, then gather more until the batch is due."""
+        item = self._queue.get()
+        if item is _STOP:
+            return self._drain(), True
+
+        batch = [item]
+        deadline = monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch + self._drain(), True
+            batch.append(item)
+        return batch, False
+
+    def _drain(self) -> list:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _write(self, batch: list):
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start : start + self.batch_size]
+            if self._insert_with_retries([row for _, row in chunk]):
+                self._record_lag(chunk)
+
+    def _insert_with_retries(self, rows: list) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._insert(rows)
+                return True
+            except Exception:
+                logger.exception("Writing %d diagnoses failed", len(rows))
+                if attempt < self.max_retries:
+                    self._count("retries")
+                    sleep(min(2**attempt, 10))
+        self._count("failed", len(rows))
+        return False
+
+    def _insert(self, rows: list):
+        db = self._session_factory()
+        try:
+            user_ids = {row["user_id"] for row in rows}
+            patients = dict(
+                db.execute(
+                    select(Patient.user_id, Patient.id).where(
+                        Patient.user_id.in_(user_ids)
+                    )
+                ).all()
+            )
+            values = [
+                {
+                    "patient_id": patients[row["user_id"]],
+                    "symptoms": row["symptoms"],
+                    "qa_pairs": row["qa_pairs"],
+                    "predicted_diagnosis": row["predicted_diagnosis"],
+                }
+                for row in rows
+                if row["user_id"] in patients
+            ]
+            if values:
+                # A list of parameter sets runs as one executemany.
+                db.execute(insert(Diagnosis), values)
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["written"] += len(values)
+            self._stats["skipped_no_patient"] += len(rows) - len(values)
+
+    def _record_lag(self, chunk: list):
+        lag = round((monotonic() - chunk[0][0]) * 1000, 1)
+        with self._lock:
+            self._stats["last_lag_ms"] = lag
+            self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], lag)
+
+    def _oldest_pending_ms(self):
+        with self._queue.mutex:
+            for item in self._queue.queue:
+                if item is not _STOP:
+                    return round((monotonic() - item[0]) * 1000, 1)
+        return None
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+
+diagnosis_writer = DiagnosisWriter(
+    batch_size=settings.diagnosis_write_batch,
+    flush_interval=settings.diagnosis_write_interval,
+    max_queue=settings.diagnosis_write_queue,
+)
+atexit.register(diagnosis_writer.stop)
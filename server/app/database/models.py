@@ -162,6 +162,7 @@ class Diagnosis(Base, BaseModel):
     )
     symptoms: Mapped[list[str]] = mapped_column(sa.ARRAY(sa.String), nullable=False)
     predicted_diagnosis: Mapped[str] = mapped_column(sa.String(255), nullable=False)
+    qa_pairs: Mapped[Optional[list]] = mapped_column(sa.JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime, server_default=sa.func.now(), nullable=False
     )
@@ -194,3 +195,19 @@ class Booking(Base, BaseModel):
         onupdate=sa.func.now(),
         nullable=False,
     )
+
+
+class RevokedToken(Base, BaseModel):
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(sa.String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # When the token would have expired anyway; the row is useless after it.
+    expires_at: Mapped[datetime] = mapped_column(
+        sa.DateTime, nullable=False, index=True
+    )
+    revoked_at: Mapped[datetime] = mapped_column(
+        sa.DateTime, server_default=sa.func.now(), nullable=False
+    )
@@ -0,0 +1,103 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.database.models import Doctor, Patient, User
+from app.settings import settings
+from app.utils.ttl_cache import TTLCache
+
+_PENDING_KEY = "user_cache_pending"
+
+
+class UserCache(TTLCache):
+    """
+    Per-worker LRU of User rows for with_authenticated_user, each kept at
+    most `ttl` seconds. Entries are detached copies that no session owns;
+    a request attaches its own copy with Session.merge(load=False), which
+    needs no query.
+
+    Writes to users, doctors and patients through the ORM invalidate the
+    user when they are flushed and again when they commit, so a request that
+    read the old row in between cannot leave it cached. Bulk UPDATE/DELETE
+    statements skip ORM events and are only caught by the TTL.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 60):
+        super().__init__(max_entries, ttl)
+        # Bumped on every invalidation; a load that started before one is
+        # not cached, as it may have read the row being changed.
+        self._generation = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, user_id: int):
+        """The user attached to `db`, or None if it does not exist."""
+        with self._lock:
+            cached = self._get(user_id)
+            generation = self._generation
+        if cached is not None:
+            return db.merge(cached, load=False)
+
+        user = db.get(User, user_id)
+        if user is not None:
+            copy = _detached_copy(user)
+            with self._lock:
+                if generation == self._generation:
+                    self._put(user_id, copy)
+        return user
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+        super().clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+def _detached_copy(user: User) -> User:
+    copy = User(**user.to_dict())
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _written_user_ids(session: Session) -> set:
+    user_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, (Doctor, Patient)):
+            user_ids.add(obj.user_id)
+    user_ids.discard(None)
+    return user_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush objects here.
+    user_ids = _written_user_ids(session)
+    for user_id in user_ids:
+        user_cache.invalidate(user_id)
+    session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+user_cache = UserCache(
+    max_entries=settings.user_cache_size, ttl=settings.user_cache_ttl
+)
@@ -3,11 +3,10 @@ from flask import request, jsonify, make_response, g
 from sqlalchemy.orm import Session
 
 from app.utils.jwt_handler import validate_access_token
-from app.crud.doctors import DoctorCrud
-from app.crud.patients import PatientCrud
 from app.crud.users import UserCrud
 from app.database.database import SessionLocal
 from app.database.models import User
+from app.database.user_cache import user_cache
 
 
 def with_db_session(func):
@@ -28,14 +27,16 @@ def with_authenticated_user(func):
         access_token = request.headers.get("access-token")
         payload = validate_access_token(access_token)
         user_id = int(payload.get("sub"))
-        user_crud = UserCrud(db)
-        user: User = user_crud.get_user(id=user_id)
+        user: User = user_cache.get(db, user_id)
 
         if not user:
             return make_response(
                 jsonify({"message": f"User with id {user_id} not found"}), 403
             )
         g.user = user
+        # Role claims from the access token; None for tokens without them.
+        g.token_roles = frozenset(payload["roles"]) if "roles" in payload else None
+        g.clinic_roles = payload.get("clinics")
 
         return func(db, *args, **kwargs)
 
@@ -46,23 +47,16 @@ def roles_required(*allowed_roles):
     def decorator(func):
         @wraps(func)
         def wrapper(db: Session, *args, **kwargs):
-            doctor_crud = DoctorCrud(db)
-            patient_crud = PatientCrud(db)
-
             user = g.user
-            user_role = g.user.global_role
+            user_roles = g.get("token_roles")
+            if user_roles is None:
+                user_roles = UserCrud(db).roles(user_id=user.id)["roles"]
 
-            if not user_role:
-                if "doctor" in allowed_roles:
-                    user_role = (
-                        "doctor" if doctor_crud.isDoctor(user_id=user.id) else None
-                    )
-                elif "patient" in allowed_roles:
-                    user_role = (
-                        "patient" if patient_crud.isPatient(user_id=user.id) else None
-                    )
+            user_role = next(
+                (role for role in allowed_roles if role in user_roles), None
+            )
 
-            if user_role not in allowed_roles:
+            if user_role is None:
                 return make_response(
                     jsonify(
                         {
@@ -13,6 +13,7 @@ from app.routers.patients import patient_bp
 from app.routers.doctors import doctor_bp
 from app.routers.clinics import clinic_bp
 from app.routers.profile import profile_bp
+from app.routers.metrics import metrics_bp
 
 from app.sessionStorage.middleware import session_middleware
 
@@ -40,6 +41,7 @@ CORS(
                 "Accept",
                 "x-session-id",
                 "X-Session-Id",
+                "X-Cache-Bypass",
             ],
             "expose_headers": [
                 "Authorization",
@@ -62,6 +64,7 @@ api_bp.register_blueprint(doctor_bp, url_prefix="/doctor")
 api_bp.register_blueprint(clinic_bp, url_prefix="/clinic")
 api_bp.register_blueprint(questions_bp, url_prefix="/questions")
 api_bp.register_blueprint(profile_bp, url_prefix="/profile")
+api_bp.register_blueprint(metrics_bp, url_prefix="/metrics")
 
 app.register_blueprint(api_bp)
 
@@ -0,0 +1,57 @@
+from flask import Blueprint, jsonify
+from sqlalchemy.orm import Session
+
+from ..ai.circuit_breaker import breaker
+from ..auth.revocation import revocation_list
+from ..ai.client_pool import pool_stats
+from ..ai.hedging import hedger
+from ..ai.response_cache import response_cache
+from ..ai.routing import router
+from ..ai.scheduler import scheduler
+from ..ai.singleflight import inflight
+from ..ai.speculation import speculator
+from ..ai.telemetry import telemetry
+from ..database.diagnosis_writer import diagnosis_writer
+from ..database.user_cache import user_cache
+from ..decorators.decorators import (
+    with_db_session,
+    with_authenticated_user,
+    roles_required,
+)
+from ..sessionStorage.middleware import session_stats
+from ..sessionStorage.sessionStorage import backend as session_backend
+from ..triage.engine import get_triage_engine
+from ..utils.hashing import password_stats
+from ..utils.jwt_handler import token_cache
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+@metrics_bp.route("", methods=["GET"])
+@with_db_session
+@with_authenticated_user
+@roles_required("admin", "support")
+def get_metrics(db: Session):
+    triage = get_triage_engine()
+    return jsonify(
+        {
+            "gemini_pool": pool_stats(),
+            "response_cache": response_cache.stats(),
+            "speculation": speculator.stats(),
+            "single_flight": inflight.stats(),
+            "scheduler": scheduler.stats(),
+            "llm": telemetry.stats(),
+            "routing": {"routes": router.stats(), "calls": telemetry.route_counts()},
+            "hedging": hedger.stats(),
+            "circuit_breaker": breaker.stats(),
+            "diagnosis_writer": diagnosis_writer.stats(),
+            "sessions": {**session_backend.stats(), "requests": session_stats()},
+            "triage": triage.stats() if triage else {"mode": "off"},
+            "auth": {
+                "token_cache": token_cache.stats(),
+                "user_cache": user_cache.stats(),
+                "passwords": password_stats(),
+                "revocation": revocation_list.stats(),
+            },
+        }
+    )
@@ -1,12 +1,371 @@
-from flask import Blueprint, request, jsonify, g
-from app.ai.gemini_client import GeminiClient
-import asyncio
-
-from app.sessionStorage.sessionStorage import debug_get_all_session
+import json
+
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
+from app.ai.batch import BatchReport, batch_limits, run_batch
+from app.ai.circuit_breaker import CircuitOpen
+from app.ai.client_pool import get_gemini_client
+from app.ai.config import AISettings
+from app.ai.event_loop import run_llm, iterate_llm
+from app.ai.gemini_client import StructuredOutputInvalid
+from app.ai.prompts import (
+    initial_prompt,
+    next_question_prompt,
+    diagnosis_prompt,
+    structured_prompt,
+)
+from app.ai.prompt_budget import compact_history, recent_history
+from app.ai.scheduler import SchedulerOverloaded
+from app.ai.response_cache import response_cache, interview_cache_key, cache_bypassed
+from app.ai.speculation import BRANCHES, speculation_enabled, speculator
+from app.ai.telemetry import telemetry
+
+from app.database.diagnosis_writer import diagnosis_writer
+from app.schemas.questionSchemas import NextStepSchema, DiagnosisSchema
+from app.triage.engine import get_triage_engine
+from app.sessionStorage.interviewState import InterviewState
+from app.sessionStorage.sessionStorage import debug_get_all_session, save_session
+from ..decorators.decorators import (
+    with_db_session,
+    with_authenticated_user,
+    roles_required,
+)
 from ..utils.jwt_handler import validate_access_token
 
 questions_bp = Blueprint("questions_bp", __name__)
 
+ai_settings = AISettings()
+
+# Asked, in order, while the circuit breaker is open so the interview can
+# carry on without Gemini. Diagnosis has no fallback.
+FALLBACK_QUESTIONS = (
+    "Did the pain start suddenly?",
+    "Has the pain been getting worse over time?",
+    "Is the pain constant rather than coming and going?",
+    "Do you have a fever?",
+    "Does the pain keep you from your usual daily activities?",
+)
+
+STRUCTURED_SCHEMAS = {
+    "initial": NextStepSchema,
+    "next": NextStepSchema,
+    "diagnosis": DiagnosisSchema,
+}
+
+
+@questions_bp.errorhandler(SchedulerOverloaded)
+def llm_overloaded(e):
+    return jsonify({"error": str(e)}), 503
+
+
+@questions_bp.errorhandler(CircuitOpen)
+def llm_unavailable(e):
+    response = jsonify({"error": str(e)})
+    response.headers["Retry-After"] = str(int(e.retry_after))
+    return response, 503
+
+
+def _interview() -> InterviewState:
+    """The interview in this session, upgrading one saved as parallel lists."""
+    state = g.session_data.get("interview")
+    if state is None:
+        state = InterviewState.from_legacy(g.session_data)
+        g.session_data.clear()
+        g.session_data["interview"] = state
+    return state
+
+
+def _cache_key(client, kind: str, paired: dict) -> str:
+    return interview_cache_key(
+        kind, _interview().pain_points, paired, client.model_for(kind)
+    )
+
+
+def _usage() -> dict:
+    """Running LLM totals for this interview, reported once it is diagnosed."""
+    return _interview().usage
+
+
+async def _generate(
+    client, kind: str, prompt: str, priority: str = None, usage: dict = None
+):
+    """
+    The LLM call for `kind`: a parsed schema in structured mode, else text.
+    When Gemini keeps returning JSON that does not parse, the plain text
+    prompt is used instead.
+    """
+    priority = priority or kind
+    if ai_settings.structured_output:
+        try:
+            return await client.generate_structured(
+                structured_prompt(kind, prompt),
+                STRUCTURED_SCHEMAS[kind],
+                kind=priority,
+                usage=usage,
+                route=kind,
+            )
+        except StructuredOutputInvalid:
+            pass
+    return await client.generate_response(
+        prompt, kind=priority, usage=usage, route=kind
+    )
+
+
+def _as_text(result) -> str:
+    if isinstance(result, NextStepSchema):
+        return result.question
+    if isinstance(result, DiagnosisSchema):
+        return result.model_dump_json()
+    return result
+
+
+def _reply(result):
+    """
+    JSON body for a question or diagnosis. Structured fields are spread into
+    the body, and a final diagnosis is kept in the session as a small dict.
+    """
+    body = {"message": "Succesful Prompt", "response": _as_text(result)}
+    if isinstance(result, NextStepSchema):
+        body["is_final"] = result.is_final
+        diagnosis = result.diagnosis_fields()
+    elif isinstance(result, DiagnosisSchema):
+        diagnosis = result.model_dump()
+    else:
+        return jsonify(body)
+
+    if diagnosis is not None:
+        _interview().diagnosis = diagnosis
+        body.update(diagnosis)
+    return jsonify(body)
+
+
+def _final_step(result):
+    """The diagnosis fields of a /next step that ends the interview, else None."""
+    if isinstance(result, NextStepSchema):
+        return result.diagnosis_fields()
+    return None
+
+
+def _local_step(question: str):
+    """A question not produced by Gemini, in the shape the current mode expects."""
+    if not ai_settings.structured_output:
+        return question
+    return NextStepSchema(
+        question=question,
+        is_final=False,
+        diagnosis="",
+        confidence="",
+        recommendation="",
+        advice="",
+    )
+
+
+def _fallback_question():
+    asked = set(_interview().questions)
+    for question in FALLBACK_QUESTIONS:
+        if question not in asked:
+            return _local_step(question)
+    return None
+
+
+def _predicted_diagnosis(response) -> str:
+    if isinstance(response, (DiagnosisSchema, NextStepSchema)):
+        return response.diagnosis
+    try:
+        return str(json.loads(response)["diagnosis"])
+    except (ValueError, TypeError, KeyError):
+        pass
+    # Free text: the model leads with the most likely condition.
+    lines = [line.strip() for line in str(response).splitlines() if line.strip()]
+    return lines[0] if lines else ""
+
+
+def _finish_interview(response):
+    """
+    Count the finished interview and queue it for the diagnosis table. Runs
+    before _reply stores the diagnosis, so an interview the model already
+    ended at /next is not counted again by a later /diagnos.
+    """
+    if _interview().diagnosis is not None:
+        return
+    telemetry.record_interview(_usage())
+    _persist_diagnosis(response)
+
+
+def _persist_diagnosis(response):
+    """Queue the finished interview for the diagnosis table; never blocks."""
+    state = _interview()
+    diagnosis_writer.submit(
+        user_id=state.user_id,
+        symptoms=state.pain_points.split(", "),
+        qa_pairs=[
+            {"question": question, "answer": answer}
+            for question, answer in state.turns
+        ],
+        predicted=_predicted_diagnosis(response),
+    )
+
+
+def _ask(kind: str, prompt: str, paired: dict, precomputed=None):
+    client = get_gemini_client()
+    key = _cache_key(client, kind, paired)
+
+    if precomputed is not None:
+        response_cache.put(key, precomputed)
+        return precomputed
+
+    if not cache_bypassed(request.headers):
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    try:
+        response = run_llm(_generate(client, kind, prompt, usage=_usage()))
+    except CircuitOpen:
+        fallback = None if kind == "diagnosis" else _fallback_question()
+        if fallback is None:
+            raise
+        return fallback
+    # In structured mode the key holds parsed schemas; the plain text that
+    # _generate falls back to is returned but not cached in their place.
+    if not (ai_settings.structured_output and isinstance(response, str)):
+        response_cache.put(key, response)
+    return response
+
+
+def _history(paired: dict):
+    """Returns (summary, recent turns), summarizing older turns when over budget."""
+    client = get_gemini_client()
+    usage = _usage()
+    try:
+        return compact_history(
+            _interview(),
+            paired,
+            lambda prompt: run_llm(
+                client.generate_response(prompt, kind="summarization", usage=usage)
+            ),
+            budget=ai_settings.prompt_history_budget,
+            keep_recent=ai_settings.prompt_recent_turns,
+        )
+    except CircuitOpen:
+        # Send the longer history this turn rather than fail the request.
+        return recent_history(_interview(), paired)
+
+
+def _triage_question():
+    """The next question from the local triage graph, if the path is covered."""
+    engine = get_triage_engine()
+    if engine is None:
+        return None
+    state = _interview()
+    question = engine.next_question(state.pain_points, state.questions, state.answers)
+    return None if question is None else _local_step(question)
+
+
+def _speculated(answer):
+    if not speculation_enabled:
+        return None
+    return speculator.take(g.session_id, answer)
+
+
+def _speculate_next():
+    """Start background calls for every possible answer to the question just asked."""
+    if not speculation_enabled:
+        return
+
+    client = get_gemini_client()
+    engine = get_triage_engine()
+    state = _interview()
+    questions_asked = state.questions
+    branches = {}
+    for answer in BRANCHES:
+        answers = state.answers + [answer]
+        if engine is not None and engine.covers(
+            state.pain_points, questions_asked, answers
+        ):
+            continue
+        paired = state.paired_with(answer)
+        if response_cache.contains(_cache_key(client, "next", paired)):
+            continue
+        summary, recent = recent_history(state, paired)
+        prompt = next_question_prompt(state.pain_points, recent, summary)
+        branches[answer] = lambda prompt=prompt: _generate(
+            client, "next", prompt, priority="speculation"
+        )
+
+    speculator.launch(g.session_id, branches)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream(
+    kind: str, prompt: str, paired: dict, record_question: bool, precomputed=None
+) -> Response:
+    """
+    Streams the completion as Server-Sent Events: one "chunk" event per
+    piece of text, then a "done" event carrying the assembled response.
+    """
+    client = get_gemini_client()
+    key = _cache_key(client, kind, paired)
+    usage = _usage()
+    cached = precomputed
+    if cached is None and not cache_bypassed(request.headers):
+        cached = response_cache.get(key)
+    final = _final_step(cached)
+    if final is not None:
+        step = cached
+    if cached is not None:
+        cached = _as_text(cached)
+
+    def events():
+        if cached is not None:
+            parts = [cached]
+            yield _sse("chunk", {"text": cached})
+        else:
+            parts = []
+            try:
+                stream = client.stream_response(prompt, kind=kind, usage=usage)
+                for text in iterate_llm(stream):
+                    parts.append(text)
+                    yield _sse("chunk", {"text": text})
+            except Exception as e:
+                yield _sse("error", {"error": str(e)})
+                return
+
+        response = "".join(parts)
+        # In structured mode the key holds parsed schemas for _ask, which
+        # the streamed text cannot stand in for.
+        if precomputed is not None:
+            response_cache.put(key, precomputed)
+        elif cached is None and not ai_settings.structured_output:
+            response_cache.put(key, response)
+
+        # after_request has already saved the session by the time the body
+        # is streamed, so persist the finished turn explicitly.
+        done = {"message": "Succesful Prompt", "response": response}
+        if record_question:
+            _interview().ask(response)
+        if final is not None:
+            # A structured /next step, precomputed or cached, that ends the
+            # interview.
+            _finish_interview(step)
+            _interview().diagnosis = final
+            done.update(is_final=True, **final)
+        elif kind == "diagnosis":
+            _finish_interview(response)
+        save_session(g.session_id, g.session_data)
+        if record_question and final is None:
+            _speculate_next()
+
+        yield _sse("done", done)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @questions_bp.route("/initial", methods=["POST"])
 def initialQuestion():
@@ -26,32 +385,17 @@ def initialQuestion():
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
 
-    client = GeminiClient()
-
     g.session_data.clear()
-    g.session_data["user_id"] = user_id
-    g.session_data["initialPainPoints"] = ", ".join(promptinfo)
-    g.session_data["questionsAsked"] = []
-    g.session_data["answers"] = []
+    state = g.session_data["interview"] = InterviewState(user_id, ", ".join(promptinfo))
 
-    prompt = f"""
-    You are a medical assistant helping a user through a diagnostic flow.
-    
-    Please make the questions clear and concise.
+    prompt = initial_prompt(state.pain_points, state.answers, state.questions)
 
-    Initial areas of concern: {g.session_data["initialPainPoints"]}
-    Previous Answers: {g.session_data["answers"]}
-    Questions Already Asked: {g.session_data["questionsAsked"]}
+    response = _triage_question() or _ask("initial", prompt, {})
 
-    DO NOT ask a question that cannot be a yes or no answer, no question you ask can be multi-faceted in anyway. It must be a clear yes or no question.
+    state.ask(_as_text(response))
+    _speculate_next()
 
-    """
-
-    response = asyncio.run(client.generate_response(prompt))
-
-    g.session_data["questionsAsked"].append(response)
-
-    return jsonify({"message": "Succesful Prompt", "response": response})
+    return _reply(response)
 
 
 @questions_bp.route("/next", methods=["POST"])
@@ -68,31 +412,26 @@ def nextQuestion():
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
 
-    g.session_data["answers"].append(promptinfo)
+    state = _interview()
+    state.answer(promptinfo)
 
-    paired = dict(zip(g.session_data["questionsAsked"], g.session_data["answers"]))
+    paired = state.paired()
     print(paired, "PAIRED INFORMATION")
-    client = GeminiClient()
-
-    prompt = f"""
-    You are a medical assistant helping a user through a diagnostic flow. Your goal is to try and diagnos the patient based on a set of symptoms.
-    
-    
-    DO NOT reiterate previous questions in your answer, do not mention them.
-    
-    Please do not repeat a question that has already been asked.
-    Also please look for the next question that may best address the currently known set of questions and answers as well as initial pain points.
-    Initial areas of concern: {g.session_data["initialPainPoints"]}
-    Previously asked questions and answers of the form (question, answer): {paired}
-
-    DO NOT ask a question that cannot be a yes or no answer, no question you ask can be multi-faceted in anyway. It must be a clear yes or no question.
-    """
 
-    response = asyncio.run(client.generate_response(prompt))
+    response = _triage_question()
+    if response is None:
+        summary, recent = _history(paired)
+        prompt = next_question_prompt(state.pain_points, recent, summary)
+        response = _ask("next", prompt, paired, precomputed=_speculated(promptinfo))
 
-    g.session_data["questionsAsked"].append(response)
+    state.ask(_as_text(response))
+    if _final_step(response) is not None:
+        # The model ended the interview early (structured mode).
+        _finish_interview(response)
+    else:
+        _speculate_next()
 
-    return jsonify({"message": "Succesful Prompt", "response": response})
+    return _reply(response)
 
 
 @questions_bp.route("/diagnos", methods=["POST"])
@@ -109,29 +448,117 @@ def verdict():
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
 
-    g.session_data["answers"].append(promptinfo)
+    state = _interview()
+    state.answer(promptinfo)
 
-    paired = dict(zip(g.session_data["questionsAsked"], g.session_data["answers"]))
+    paired = state.paired()
 
-    prompt = f"""
-    You are a clinical diagnostic assistant. The user has completed a guided diagnostic interview. Based on their initial symptoms and the complete set of questions and answers, your goal is to provide the most likely diagnosis (or a short list of likely conditions), along with a brief rationale for your assessment.
+    summary, recent = _history(paired)
+    prompt = diagnosis_prompt(state.pain_points, recent, summary)
 
-    Be direct and medically focused. Include:
-    - A most likely condition (or top 3 possibilities if uncertain)
-    - A short clinical reasoning for the assessment
-    - Avoid asking further questions
-    - Do not repeat or restate the input
+    if speculation_enabled:
+        speculator.discard(g.session_id)
 
-    Initial areas of concern: {g.session_data["initialPainPoints"]}
+    response = _ask("diagnosis", prompt, paired)
+    _finish_interview(response)
 
-    Question and Answer History:
-    {paired}
+    return _reply(response)
 
-    Now, based on this data, what is the most probable diagnosis or set of diagnoses?
-    """
 
-    client = GeminiClient()
+@questions_bp.route("/next/stream", methods=["POST"])
+def nextQuestionStream():
+    access_token = request.headers.get("access-token")
+    payload = validate_access_token(access_token)
+
+    promptinfo = request.get_json()["answer"]
+
+    user_id = int(payload.get("sub"))
+
+    if not promptinfo:
+        return jsonify({"error": "prompt info is required"}), 400
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
 
-    response = asyncio.run(client.generate_response(prompt))
+    state = _interview()
+    state.answer(promptinfo)
+
+    paired = state.paired()
+
+    local = _triage_question()
+    if local is not None:
+        return _stream("next", None, paired, record_question=True, precomputed=local)
+
+    summary, recent = _history(paired)
+    prompt = next_question_prompt(state.pain_points, recent, summary)
+
+    return _stream(
+        "next",
+        prompt,
+        paired,
+        record_question=True,
+        precomputed=_speculated(promptinfo),
+    )
+
+
+@questions_bp.route("/diagnos/stream", methods=["POST"])
+def verdictStream():
+    access_token = request.headers.get("access-token")
+    payload = validate_access_token(access_token)
 
-    return jsonify({"message": "Succesful Prompt", "response": response})
+    promptinfo = request.get_json()["answer"]
+
+    user_id = int(payload.get("sub"))
+
+    if not promptinfo:
+        return jsonify({"error": "prompt info is required"}), 400
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    state = _interview()
+    state.answer(promptinfo)
+
+    paired = state.paired()
+    summary, recent = _history(paired)
+    prompt = diagnosis_prompt(state.pain_points, recent, summary)
+
+    if speculation_enabled:
+        speculator.discard(g.session_id)
+
+    return _stream("diagnosis", prompt, paired, record_question=False)
+
+
+@questions_bp.route("/batch", methods=["POST"])
+@with_db_session
+@with_authenticated_user
+@roles_required("admin", "auditor")
+def batchDiagnosis(db):
+    """
+    Re-runs the diagnosis prompt over completed interviews.
+    Body: NDJSON, one transcript per line (see app.ai.batch).
+    Query: concurrency, retries, rate (calls per second), capped by AISettings.
+    Streams one NDJSON result per transcript in completion order, then a
+    final {"summary": ...} line.
+    """
+    lines = request.get_data(as_text=True).splitlines()
+    if not any(line.strip() for line in lines):
+        return jsonify({"error": "At least one transcript is required"}), 400
+
+    try:
+        concurrency, retries, rate = batch_limits(
+            request.args.get("concurrency", type=int),
+            request.args.get("retries", type=int),
+            request.args.get("rate", type=float),
+            clamp=True,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    client = get_gemini_client()
+    report = BatchReport()
+
+    def results():
+        batch = run_batch(client, lines, concurrency, retries, rate, report)
+        for result in iterate_llm(batch):
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"summary": report.to_dict()}) + "\n"
+
+    return Response(stream_with_context(results()), mimetype="application/x-ndjson")
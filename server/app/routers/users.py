@@ -2,9 +2,9 @@ from flask import Blueprint, request, jsonify, make_response, Response
 
 from ..crud.users import UserCrud
 from ..crud.patients import PatientCrud
-from ..auth.user_auth import auth, refresh_token
+from ..auth.user_auth import auth, refresh_token, revoke_tokens
 from ..decorators.decorators import with_db_session
-from ..utils.jwt_handler import validate_access_token
+from ..utils.jwt_handler import validate_access_token, validate_access_token_helper
 
 from ..database.models import User
 
@@ -115,3 +115,26 @@ def refresh_user_token(db) -> Response:
         ),
         200,
     )
+
+
+@user_bp.route("/logout", methods=["POST"])
+def logout_user() -> Response:
+    """
+    Revokes the access token and, when sent, the refresh token, so neither
+    is accepted again before it expires.
+    Headers: access-token, optional refresh-token (of the same user).
+    """
+    payload = validate_access_token(request.headers.get("access-token"))
+    payloads = [payload]
+
+    refresh_token_value = request.headers.get("refresh-token")
+    if refresh_token_value:
+        refresh_payload = validate_access_token_helper(refresh_token_value)
+        if not refresh_payload or refresh_payload.get("sub") != payload.get("sub"):
+            return make_response(jsonify({"message": "Invalid refresh-token"}), 400)
+        payloads.append(refresh_payload)
+
+    revoked = revoke_tokens(*payloads)
+    return make_response(
+        jsonify({"message": "Successfully logged out", "revoked": revoked}), 200
+    )
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Literal
+
+# Response schemas sent to Gemini in structured-output mode. The diagnosis
+# fields of NextStepSchema stay empty until is_final is true. The SDK sends
+# these without a `required` list, so Gemini may still leave a field out;
+# GeminiClient.generate_structured asks again when a reply does not parse.
+
+
+class NextStepSchema(BaseModel):
+    question: str
+    is_final: bool
+    diagnosis: str
+    confidence: str
+    recommendation: str
+    advice: str
+
+    def diagnosis_fields(self):
+        if not self.is_final:
+            return None
+        return {
+            "diagnosis": self.diagnosis,
+            "confidence": self.confidence,
+            "recommendation": self.recommendation,
+            "advice": self.advice,
+        }
+
+
+class DiagnosisSchema(BaseModel):
+    diagnosis: str
+    confidence: Literal["high", "medium", "low"]
+    recommendation: Literal["self_care", "see_doctor"]
+    advice: str
@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import monotonic, sleep, time
+
+try:
+    import redis
+except ImportError:  # only needed for SESSION_BACKEND=redis
+    redis = None
+
+from app.sessionStorage.codec import decode, encode, jsonable
+from app.utils.per_process import PerProcess, daemon_thread
+
+
+class SessionBackend:
+    """
+    Where interview sessions live between requests. Sessions expire `ttl`
+    seconds after they were last saved. get() returns {} for a missing or
+    expired session. get_many/save_many do several sessions in one round
+    trip where the backend supports it.
+    """
+
+    name = "base"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def get(self, session_id: str) -> dict:
+        return self.get_many([session_id])[session_id]
+
+    def save(self, session_id: str, data: dict):
+        self.save_many({session_id: data})
+
+    def get_many(self, session_ids: list) -> dict:
+        raise NotImplementedError
+
+    def save_many(self, sessions: dict):
+        raise NotImplementedError
+
+    def clear(self, session_id: str):
+        raise NotImplementedError
+
+    def all(self) -> dict:
+        """Every live session; for debugging only."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "ttl_seconds": self.ttl}
+
+
+class MemoryBackend(SessionBackend):
+    """
+    The per-process store; sessions are not shared between workers.
+
+    An OrderedDict in save order. Every session lives `ttl` seconds after
+    its last save, so save order is also expiry order: expired sessions are
+    always at the front and sweeping pops them in O(1) each, and going over
+    `max_entries` evicts the least recently saved. A daemon thread sweeps
+    every `sweep_interval` seconds so idle workers give memory back too.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self, ttl: int, max_entries: int = 10000, sweep_interval: float = 60
+    ):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        # session_id -> [data, expires_at, approximate size in bytes]
+        self.store = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = PerProcess(
+            lambda: daemon_thread(self._sweep_forever, "session-sweeper")
+        )
+        self._stats = {"expired": 0, "evicted": 0}
+
+    def get_many(self, session_ids: list) -> dict:
+        now = monotonic()
+        sessions = {}
+        with self._lock:
+            for session_id in session_ids:
+                entry = self.store.get(session_id)
+                live = entry is not None and entry[1] > now
+                sessions[session_id] = entry[0] if live else {}
+        return sessions
+
+    def save_many(self, sessions: dict):
+        self._ensure_sweeper()
+        expires_at = monotonic() + self.ttl
+        sizes = {sid: _size(data) for sid, data in sessions.items()}
+        with self._lock:
+            for session_id, data in sessions.items():
+                old = self.store.pop(session_id, None)
+                if old is not None:
+                    self._bytes -= old[2]
+                self.store[session_id] = [data, expires_at, sizes[session_id]]
+                self._bytes += sizes[session_id]
+            while len(self.store) > self.max_entries:
+                self._pop_oldest("evicted")
+
+    def clear(self, session_id: str):
+        with self._lock:
+            entry = self.store.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def all(self) -> dict:
+        now = monotonic()
+        with self._lock:
+            return {
+                sid: entry[0] for sid, entry in self.store.items() if entry[1] > now
+            }
+
+    def sweep(self) -> int:
+        """Drop every expired session; returns how many were dropped."""
+        now = monotonic()
+        dropped = 0
+        with self._lock:
+            while self.store and next(iter(self.store.values()))[1] <= now:
+                self._pop_oldest("expired")
+                dropped += 1
+        return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["live_sessions"] = len(self.store)
+            stats["bytes"] = self._bytes
+        stats.update(super().stats())
+        stats["max_entries"] = self.max_entries
+        return stats
+
+    def _pop_oldest(self, reason: str):
+        _, entry = self.store.popitem(last=False)
+        self._bytes -= entry[2]
+        self._stats[reason] += 1
+
+    def _ensure_sweeper(self):
+        if self.sweep_interval > 0:
+            self._sweeper.get()
+
+    def _sweep_forever(self):
+        while True:
+            sleep(self.sweep_interval)
+            self.sweep()
+
+
+def _size(data: dict) -> int:
+    # Serialized size is a stable, cheap stand-in for the real footprint.
+    return len(json.dumps(data, default=jsonable))
+
+
+class RedisBackend(SessionBackend):
+    """
+    Sessions encoded by app.sessionStorage.codec in Redis (or anything
+    speaking its protocol), expired by the server with SET EX. Multi-session
+    calls are pipelined.
+    """
+
+    name = "redis"
+
+    def __init__(self, ttl: int, url: str, prefix: str = "session:", client=None):
+        super().__init__(ttl)
+        if client is None:
+            if redis is None:
+                raise RuntimeError("SESSION_BACKEND=redis needs the redis package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, session_ids: list) -> dict:
+        if not session_ids:
+            return {}
+        values = self.client.mget([self.prefix + sid for sid in session_ids])
+        return {
+            session_id: decode(value) if value else {}
+            for session_id, value in zip(session_ids, values)
+        }
+
+    def save_many(self, sessions: dict):
+        pipe = self.client.pipeline(transaction=False)
+        for session_id, data in sessions.items():
+            pipe.set(self.prefix + session_id, encode(data), ex=self.ttl)
+        pipe.execute()
+
+    def clear(self, session_id: str):
+        self.client.delete(self.prefix + session_id)
+
+    def all(self) -> dict:
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=500))
+        session_ids = [
+            (key.decode() if isinstance(key, bytes) else key)[len(self.prefix) :]
+            for key in keys
+        ]
+        return self.get_many(session_ids)
+
+
+class SQLiteBackend(SessionBackend):
+    """
+    Sessions in a SQLite file that every worker on the host opens. Expiry is
+    stored per row, filtered on read and purged every `purge_every` writes.
+    WAL mode lets readers and the single writer proceed concurrently.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, ttl: int, path: str, purge_every: int = 500):
+        super().__init__(ttl)
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)"
+        )
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread, and the process, that
+        # opened them; a forked worker opens its own.
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get_many(self, session_ids: list) -> dict:
+        sessions = {session_id: {} for session_id in session_ids}
+        if not session_ids:
+            return sessions
+        placeholders = ",".join("?" * len(session_ids))
+        rows = self._db().execute(
+            f"SELECT id, data FROM sessions "
+            f"WHERE id IN ({placeholders}) AND expires_at > ?",
+            (*session_ids, time()),
+        )
+        for session_id, data in rows:
+            sessions[session_id] = decode(data)
+        return sessions
+
+    def save_many(self, sessions: dict):
+        expires_at = time() + self.ttl
+        self._db().executemany(
+            "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+            [
+                (session_id, encode(data), expires_at)
+                for session_id, data in sessions.items()
+            ],
+        )
+        with self._lock:
+            self._writes += len(sessions)
+            purge = self._writes >= self.purge_every
+            if purge:
+                self._writes = 0
+        if purge:
+            self._db().execute("DELETE FROM sessions WHERE expires_at <= ?", (time(),))
+
+    def clear(self, session_id: str):
+        self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def all(self) -> dict:
+        rows = self._db().execute(
+            "SELECT id, data FROM sessions WHERE expires_at > ?", (time(),)
+        )
+        return {session_id: decode(data) for session_id, data in rows}
+
+
+def create_backend(settings) -> SessionBackend:
+    if settings.session_backend == "redis":
+        return RedisBackend(settings.session_ttl, settings.session_redis_url)
+    if settings.session_backend == "sqlite":
+        return SQLiteBackend(settings.session_ttl, settings.session_sqlite_path)
+    if settings.session_backend == "memory":
+        return MemoryBackend(
+            settings.session_ttl,
+            max_entries=settings.session_max_entries,
+            sweep_interval=settings.session_sweep_interval,
+        )
+    raise ValueError(f"Unknown SESSION_BACKEND {settings.session_backend!r}")
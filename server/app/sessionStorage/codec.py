@@ -0,0 +1,62 @@
+"""
+Byte encoding of session dicts for backends that store them outside the
+process. One leading byte says how the rest was written: "m" msgpack,
+"j" JSON, upper case when it is also zlib-compressed. msgpack is used when
+installed; every worker sharing a backend must then have it.
+"""
+
+import json
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from app.sessionStorage.interviewState import InterviewState
+
+# zlib costs more than encoding itself (about 20 us for a 2 KB session) and a
+# typical interview is a few KB, so only long ones are compressed.
+COMPRESS_MIN_BYTES = 8192
+
+_INTERVIEW_KEY = "__interview__"
+
+
+def jsonable(obj):
+    """`default` hook for json.dumps/msgpack.packb of session dicts."""
+    if isinstance(obj, InterviewState):
+        return {_INTERVIEW_KEY: obj.to_dict()}
+    raise TypeError(f"Cannot serialize {type(obj).__name__} in a session")
+
+
+def _revive(obj: dict):
+    state = obj.get(_INTERVIEW_KEY)
+    return InterviewState.from_dict(state) if state is not None else obj
+
+
+def encode(data: dict) -> bytes:
+    if msgpack is not None:
+        fmt = b"m"
+        raw = msgpack.packb(data, default=jsonable, use_bin_type=True)
+    else:
+        fmt = b"j"
+        raw = json.dumps(data, default=jsonable, separators=(",", ":")).encode()
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return fmt.upper() + zlib.compress(raw, 1)
+    return fmt + raw
+
+
+def decode(blob) -> dict:
+    if isinstance(blob, str):
+        blob = blob.encode()
+    fmt, raw = blob[:1], blob[1:]
+    if fmt not in (b"m", b"j", b"M", b"J"):
+        # Plain JSON written before this encoding existed.
+        return json.loads(blob, object_hook=_revive)
+    if fmt.isupper():
+        fmt, raw = fmt.lower(), zlib.decompress(raw)
+    if fmt == b"m":
+        if msgpack is None:
+            raise RuntimeError("Session was written with msgpack, which is missing")
+        return msgpack.unpackb(raw, object_hook=_revive, raw=False)
+    return json.loads(raw, object_hook=_revive)
@@ -0,0 +1,147 @@
+# Version 1 stored turns as [question, answer] pairs; 2 stores them flat.
+SCHEMA_VERSION = 2
+
+
+class InterviewState:
+    """
+    One symptom interview: the pain points, an append-only log of answered
+    turns and the question currently awaiting an answer.
+
+    The log is one flat [question, answer, question, answer, ...] list: no
+    per-turn tuples to allocate, and to_dict() hands it to the encoder as
+    is. The question -> answer dict every prompt needs is built once per
+    turn and cached instead of re-zipped on each use. The rolling summary,
+    LLM usage totals and the final diagnosis live here too, so the whole
+    interview serializes as one compact, versioned record.
+    """
+
+    __slots__ = (
+        "user_id",
+        "pain_points",
+        "log",
+        "pending",
+        "summary",
+        "summarized_turns",
+        "usage",
+        "diagnosis",
+        "_paired",
+    )
+
+    def __init__(
+        self,
+        user_id: int,
+        pain_points: str,
+        log: list = None,
+        pending: str = None,
+        summary: str = "",
+        summarized_turns: int = 0,
+        usage: dict = None,
+        diagnosis: dict = None,
+    ):
+        self.user_id = user_id
+        self.pain_points = pain_points
+        self.log = log if log is not None else []
+        self.pending = pending
+        self.summary = summary
+        self.summarized_turns = summarized_turns
+        self.usage = usage if usage is not None else {}
+        self.diagnosis = diagnosis
+        self._paired = None
+
+    def ask(self, question: str):
+        self.pending = question
+
+    def answer(self, answer: str):
+        self.log += (self.pending or "", answer)
+        self.pending = None
+        self._paired = None
+
+    @property
+    def turns(self):
+        """(question, answer) for every answered turn."""
+        return zip(self.log[::2], self.log[1::2])
+
+    @property
+    def questions(self) -> list:
+        """Every question asked so far, including one still awaiting an answer."""
+        questions = self.log[::2]
+        if self.pending is not None:
+            questions.append(self.pending)
+        return questions
+
+    @property
+    def answers(self) -> list:
+        return self.log[1::2]
+
+    def paired(self) -> dict:
+        if self._paired is None:
+            self._paired = dict(self.turns)
+        return self._paired
+
+    def paired_with(self, answer: str) -> dict:
+        """The history as it would be if the pending question got `answer`."""
+        return {**self.paired(), self.pending or "": answer}
+
+    def fold_summary(self, summary: str, turns: int):
+        self.summary = summary
+        self.summarized_turns += turns
+
+    def to_dict(self) -> dict:
+        return {
+            "v": SCHEMA_VERSION,
+            "u": self.user_id,
+            "p": self.pain_points,
+            "t": self.log,
+            "q": self.pending,
+            "s": self.summary,
+            "n": self.summarized_turns,
+            "l": self.usage,
+            "d": self.diagnosis,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InterviewState":
+        version = data.get("v")
+        if version == SCHEMA_VERSION:
+            log = data["t"]
+        elif version == 1:
+            log = [text for turn in data["t"] for text in turn]
+        else:
+            raise ValueError(f"Unsupported interview state version {version}")
+        return cls(
+            user_id=data["u"],
+            pain_points=data["p"],
+            log=log,
+            pending=data["q"],
+            summary=data["s"],
+            summarized_turns=data["n"],
+            usage=data["l"],
+            diagnosis=data["d"],
+        )
+
+    @classmethod
+    def from_legacy(cls, session_data: dict) -> "InterviewState":
+        """Upgrade a session saved as parallel questionsAsked/answers lists."""
+        questions = session_data.get("questionsAsked", [])
+        answers = session_data.get("answers", [])
+        return cls(
+            user_id=session_data.get("user_id"),
+            pain_points=session_data.get("initialPainPoints", ""),
+            log=[text for turn in zip(questions, answers) for text in turn],
+            pending=questions[len(answers)] if len(questions) > len(answers) else None,
+            summary=session_data.get("historySummary", ""),
+            summarized_turns=session_data.get("summarizedTurns", 0),
+            usage=session_data.get("llmUsage", {}),
+            diagnosis=session_data.get("diagnosis"),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, InterviewState):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (
+            f"InterviewState(user_id={self.user_id!r}, turns={len(self.log) // 2}, "
+            f"pending={self.pending is not None})"
+        )
@@ -1,20 +1,104 @@
 # app/middleware.py
 
-from flask import request, g
+import hashlib
+import json
+import threading
 import uuid
+
+from flask import request, g
+from flask.ctx import _AppCtxGlobals
+from app.sessionStorage.codec import jsonable
 from app.sessionStorage.sessionStorage import get_session, save_session
 
+_stats = {"loaded": 0, "created": 0, "saved": 0, "unchanged": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def session_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _fingerprint(data: dict) -> bytes:
+    # Hashing the serialized form catches in-place changes to nested lists
+    # and dicts, which an identity or shallow comparison would miss.
+    raw = json.dumps(data, sort_keys=True, default=jsonable).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class SessionGlobals(_AppCtxGlobals):
+    """
+    `g` with a lazily loaded interview session. The session id and data are
+    only looked up when a handler first reads g.session_id or
+    g.session_data, so routes that never touch the session cost no backend
+    round trip and create no session.
+    """
+
+    # _AppCtxGlobals writes straight into __dict__, which would bypass the
+    # property setters below.
+    __setattr__ = object.__setattr__
+
+    @property
+    def session_id(self):
+        session_id = self.__dict__.get("_session_id")
+        if session_id is None:
+            session_id = request.headers.get("X-Session-Id")
+            if not session_id:
+                session_id = str(uuid.uuid4())
+                _count("created")
+            self.__dict__["_session_id"] = session_id
+        return session_id
+
+    @session_id.setter
+    def session_id(self, value):
+        self.__dict__["_session_id"] = value
+
+    @property
+    def session_data(self):
+        data = self.__dict__.get("_session_data")
+        if data is None:
+            data = self.session_data = self._load_session()
+        return data
+
+    @session_data.setter
+    def session_data(self, value):
+        self.__dict__["_session_data"] = value
+        self.__dict__["_session_fingerprint"] = _fingerprint(value)
+
+    def _load_session(self) -> dict:
+        existing = bool(request.headers.get("X-Session-Id"))
+        session_id = self.session_id
+        if not existing:
+            # A new session id was just minted; there is nothing to fetch.
+            return {}
+        _count("loaded")
+        return get_session(session_id)
+
+    def session_dirty(self) -> bool:
+        data = self.__dict__.get("_session_data")
+        if data is None:
+            return False
+        return _fingerprint(data) != self.__dict__["_session_fingerprint"]
+
 
 def session_middleware(app):
-    @app.before_request
-    def load_session():
-        print(request.headers.get("X-Session-Id"))
-        session_id = request.headers.get("X-Session-Id") or str(uuid.uuid4())
-        g.session_id = session_id
-        g.session_data = get_session(session_id)
+    app.app_ctx_globals_class = SessionGlobals
 
     @app.after_request
     def save_session_data(response):
-        save_session(g.session_id, g.session_data)
-        response.headers["X-Session-Id"] = g.session_id
+        session_id = g.get("_session_id")
+        if session_id is None:
+            return response
+
+        if g.session_dirty():
+            save_session(session_id, g.session_data)
+            _count("saved")
+        else:
+            _count("unchanged")
+        response.headers["X-Session-Id"] = session_id
         return response
@@ -1,26 +1,42 @@
 # app/session_store.py
 
-from time import time
+from app.settings import settings
+from app.sessionStorage.backends import MemoryBackend, create_backend
 
-SESSION_STORE = {}
-SESSION_TIMEOUT = 1800  # 30 minutes
+SESSION_TIMEOUT = settings.session_ttl
+
+# Selected with SESSION_BACKEND: "memory" (per process, the default),
+# "redis" or "sqlite" so every worker sees the same sessions.
+backend = create_backend(settings)
+
+# Kept for code that inspects the in-process store directly.
+SESSION_STORE = backend.store if isinstance(backend, MemoryBackend) else None
 
 
 def get_session(session_id):
-    session = SESSION_STORE.get(session_id)
-    if session and time() - session["timestamp"] < SESSION_TIMEOUT:
-        return session["data"]
-    return {}
+    return backend.get(session_id)
 
 
 def save_session(session_id, data):
-    SESSION_STORE[session_id] = {"data": data, "timestamp": time()}
+    # Requests that never started an interview (health checks, preflights)
+    # leave nothing worth keeping.
+    if data:
+        backend.save(session_id, data)
+
+
+def get_sessions(session_ids):
+    return backend.get_many(session_ids)
+
+
+def save_sessions(sessions):
+    sessions = {session_id: data for session_id, data in sessions.items() if data}
+    if sessions:
+        backend.save_many(sessions)
 
 
 def clear_session(session_id):
-    if session_id in SESSION_STORE:
-        del SESSION_STORE[session_id]
+    backend.clear(session_id)
 
 
 def debug_get_all_session():
-    return SESSION_STORE
+    return backend.all()
@@ -12,6 +12,51 @@ class Settings(BaseSettings):
 
     gemini_api_key: str
 
+    # Access tokens carry the user's roles as claims, so this is also how
+    # long a role change can take to apply.
+    access_token_minutes: int = 15
+
+    # Verified access tokens kept per worker, each until it expires, so a
+    # repeat request skips signature checking and JSON decoding.
+    token_cache_size: int = 4096
+
+    # bcrypt runs on a pool of password_hash_workers threads per worker.
+    # Hashes made with a cost other than bcrypt_rounds are redone at login.
+    password_hash_workers: int = 2
+    bcrypt_rounds: int = 12
+
+    # Revoked token ids are kept per worker in a Bloom filter sized for
+    # revocation_filter_capacity ids, rebuilt from the revoked_tokens table
+    # every revocation_refresh_interval seconds; only filter hits query it.
+    revocation_filter_capacity: int = 100000
+    revocation_filter_error_rate: float = 0.001
+    revocation_refresh_interval: float = 30
+
+    # Users looked up by with_authenticated_user are kept per worker for up
+    # to user_cache_ttl seconds; ORM writes to them invalidate the entry.
+    user_cache_size: int = 4096
+    user_cache_ttl: float = 60
+
+    # Interview session storage: "memory" keeps sessions in each worker,
+    # "redis" (session_redis_url) and "sqlite" (session_sqlite_path, a file
+    # shared by the workers on one host) let any worker serve any session.
+    session_backend: str = "memory"
+    session_ttl: int = 1800
+    # The memory backend keeps at most session_max_entries sessions (least
+    # recently saved evicted first) and drops expired ones every
+    # session_sweep_interval seconds.
+    session_max_entries: int = 10000
+    session_sweep_interval: float = 60
+    session_redis_url: str = "redis://localhost:6379/0"
+    session_sqlite_path: str = "sessions.sqlite3"
+
+    # Completed interviews are written to the diagnosis table in the
+    # background, up to diagnosis_write_batch rows per insert and at most
+    # diagnosis_write_interval seconds after they finish.
+    diagnosis_write_batch: int = 100
+    diagnosis_write_interval: float = 1.0
+    diagnosis_write_queue: int = 10000
+
     # Disable reading any .env file — only OS env-vars will be used
     model_config = SettingsConfigDict(env_file=None)
 
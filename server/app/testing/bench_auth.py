@@ -0,0 +1,58 @@
+"""
+Per-request cost of validating an access token: the old decode-and-print
+path, a cold verification and a verified-token cache hit.
+
+    python -m app.testing.bench_auth [requests]
+"""
+
+import contextlib
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import jwt
+
+from ..settings import settings
+from ..utils.jwt_handler import create_token, token_cache, validate_access_token_helper
+
+
+def old_helper(token: str):
+    # validate_access_token_helper before the cache: verify and print each time.
+    print(token)
+    payload = jwt.decode(jwt=token, key=settings.secret_key, algorithms=["HS256"])
+    print("payload:", payload)
+    return payload
+
+
+def per_call_us(fn, token: str, requests: int, before=None) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        if before is not None:
+            before()
+        fn(token)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    token = create_token(
+        {
+            "sub": "42",
+            "iss": settings.issuer,
+            "iat": datetime.utcnow(),
+            "exp": datetime.utcnow() + timedelta(minutes=30),
+        }
+    )
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        old = per_call_us(old_helper, token, requests)
+    cold = per_call_us(
+        validate_access_token_helper, token, requests, before=token_cache.clear
+    )
+    token_cache.clear()
+    warm = per_call_us(validate_access_token_helper, token, requests)
+    print(f"{requests} validations, us per request:")
+    print(f"  before (decode + print to /dev/null): {old:.2f}")
+    print(f"  cache miss (decode, then cache):      {cold:.2f}")
+    print(f"  cache hit:                            {warm:.2f}")
+    print(f"  hit ratio {token_cache.stats()['hit_ratio']:.4f}")
@@ -0,0 +1,68 @@
+"""
+Compare asyncio.run() per request with the persistent per-worker loop.
+
+    python -m app.testing.bench_event_loop [latency_seconds]
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..ai.event_loop import LoopRunner
+
+
+async def fake_llm_call(latency: float):
+    await asyncio.sleep(latency)
+    return "ok"
+
+
+def bench_overhead(runner: LoopRunner, calls: int = 2000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        asyncio.run(fake_llm_call(0))
+    per_request = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        runner.run(fake_llm_call(0))
+    persistent = (time.perf_counter() - start) / calls
+
+    print(f"per-call overhead  asyncio.run: {per_request * 1e6:8.1f} us")
+    print(f"per-call overhead  loop runner: {persistent * 1e6:8.1f} us")
+
+
+def bench_threads(runner: LoopRunner, latency: float, threads=8, requests=200):
+    def per_request(_):
+        return asyncio.run(fake_llm_call(latency))
+
+    def persistent(_):
+        return runner.run(fake_llm_call(latency))
+
+    for name, fn in (("asyncio.run", per_request), ("loop runner", persistent)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(fn, range(requests)))
+        elapsed = time.perf_counter() - start
+        print(f"{threads} threads       {name}: {requests / elapsed:8.1f} req/s")
+
+
+def bench_in_flight(runner: LoopRunner, latency: float, requests=200):
+    # A single worker thread keeping every interview in flight at once.
+    start = time.perf_counter()
+    futures = [runner.submit(fake_llm_call(latency)) for _ in range(requests)]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    print(f"1 thread, {requests} in flight: {requests / elapsed:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    runner = LoopRunner()
+    print(f"simulated LLM latency: {latency * 1000:.0f} ms")
+    print("=" * 50)
+    bench_overhead(runner)
+    bench_threads(runner, latency)
+    bench_in_flight(runner, latency)
+    runner.stop()
@@ -0,0 +1,76 @@
+"""
+Tail latency with and without hedging, and circuit breaker fail-fast, against
+the simulated backend (no network or API key needed).
+
+    python -m app.testing.bench_hedging [calls] [sigma]
+"""
+
+import asyncio
+import sys
+import time
+
+from ..ai.circuit_breaker import CircuitBreaker, CircuitOpen
+from ..ai.hedging import Hedger
+from ..ai.mock_backend import SimulatedModel
+from ..ai.telemetry import percentile
+
+
+async def run_calls(hedger: Hedger, model: SimulatedModel, calls: int, parallel=20):
+    semaphore = asyncio.Semaphore(parallel)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await hedger.run("next", lambda: model.generate_content_async("prompt"))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return sorted(latencies)
+
+
+async def bench_hedging(calls: int, sigma: float):
+    for enabled in (False, True):
+        model = SimulatedModel(
+            latency_ms=200, sigma=sigma, completion_tokens=8, seed=1
+        )
+        hedger = Hedger(enabled=enabled, percentile=0.9, min_delay_ms=50)
+        await run_calls(hedger, model, 100)  # warm up the delay estimate
+        latencies = await run_calls(hedger, model, calls)
+        stats = hedger.stats()
+        print(
+            f"hedging {'on ' if enabled else 'off'}  "
+            f"p50 {percentile(latencies, 0.50):7.1f} ms  "
+            f"p95 {percentile(latencies, 0.95):7.1f} ms  "
+            f"p99 {percentile(latencies, 0.99):7.1f} ms  "
+            f"hedge rate {stats['hedge_rate']:.3f}  win rate {stats['win_rate']:.2f}"
+        )
+
+
+async def bench_breaker(calls: int = 50):
+    model = SimulatedModel(latency_ms=300, distribution="fixed", error_rate_500=1.0)
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    refused = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        try:
+            breaker.check()
+        except CircuitOpen:
+            refused += 1
+            continue
+        try:
+            await model.generate_content_async("prompt")
+        except Exception:
+            breaker.record_failure()
+    elapsed = time.perf_counter() - start
+    print(
+        f"failing backend: {calls} calls in {elapsed:.2f} s, {refused} refused "
+        f"without waiting (breaker {breaker.stats()['state']})"
+    )
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sigma = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    asyncio.run(bench_hedging(calls, sigma))
+    asyncio.run(bench_breaker())
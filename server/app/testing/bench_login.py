@@ -0,0 +1,65 @@
+"""
+Login throughput and worker responsiveness during a burst of logins, with
+bcrypt inline on every request thread (the old behaviour) and on the
+bounded password pool. A probe thread stands in for the worker's other
+requests and records how long a small piece of work takes meanwhile.
+
+    python -m app.testing.bench_login [logins] [request_threads]
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bcrypt import checkpw
+
+from ..ai.telemetry import percentile
+from ..settings import settings
+from ..utils.hashing import hash_password, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+
+def inline_verify(password: str, hashed_password: str) -> bool:
+    return checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def probe(stop: threading.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(100_000))
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+
+
+def burst(verify, hashed: str, logins: int, threads: int):
+    stop = threading.Event()
+    latencies = []
+    prober = threading.Thread(target=probe, args=(stop, latencies))
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as requests:
+        list(requests.map(lambda _: verify(PASSWORD, hashed), range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+    latencies.sort()
+    print(
+        f"  {verify.__name__:15} {logins / elapsed:6.1f} logins/s, "
+        f"probe p50 {percentile(latencies, 0.5):6.2f} ms, "
+        f"p99 {percentile(latencies, 0.99):6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    hashed = hash_password(PASSWORD)
+    print(
+        f"{logins} logins from {threads} request threads, "
+        f"rounds {settings.bcrypt_rounds}, "
+        f"pool workers {settings.password_hash_workers}"
+    )
+    burst(inline_verify, hashed, logins, threads)
+    burst(verify_password, hashed, logins, threads)
@@ -0,0 +1,52 @@
+"""
+Estimated prompt tokens per interview turn, with and without the rolling
+history summary.
+
+    python -m app.testing.bench_prompt_size [turns] [budget] [recent_turns]
+"""
+
+import sys
+
+from ..ai.prompt_budget import compact_history, estimate_tokens
+from ..ai.prompts import next_question_prompt
+from ..sessionStorage.interviewState import InterviewState
+
+PAIN_POINTS = "head, chest"
+QUESTION = "Have you noticed the pain in your {} getting worse when you lie down at night?"
+
+
+def fake_summarize(prompt: str) -> str:
+    # Stands in for the LLM: a summary a few sentences long, whatever the input.
+    return "Patient reports head and chest pain, worse when lying down. " * 3
+
+
+def run(turns: int, budget: int, keep_recent: int):
+    state = InterviewState(42, PAIN_POINTS)
+    summarize_calls = 0
+
+    def summarize(prompt):
+        nonlocal summarize_calls
+        summarize_calls += 1
+        return fake_summarize(prompt)
+
+    print(f"{'turn':>4} {'full':>8} {'budgeted':>9} {'summaries':>10}")
+    for turn in range(1, turns + 1):
+        state.ask(QUESTION.format(f"area {turn}"))
+        state.answer("yes" if turn % 2 else "no")
+        paired = state.paired()
+
+        full = estimate_tokens(next_question_prompt(PAIN_POINTS, paired))
+        summary, recent = compact_history(
+            state, paired, summarize, budget=budget, keep_recent=keep_recent
+        )
+        budgeted = estimate_tokens(next_question_prompt(PAIN_POINTS, recent, summary))
+        print(f"{turn:>4} {full:>8} {budgeted:>9} {summarize_calls:>10}")
+
+
+if __name__ == "__main__":
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    keep_recent = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    print(f"history budget: {budget} tokens, recent turns kept: {keep_recent}")
+    print("=" * 50)
+    run(turns, budget, keep_recent)
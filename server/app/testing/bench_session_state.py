@@ -0,0 +1,116 @@
+"""
+Session representation: the old dict of parallel lists against
+InterviewState, comparing resident size, encoded size, encode/decode time
+and the per-turn cost of building the question -> answer history.
+
+    python -m app.testing.bench_session_state [sessions] [turns]
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from ..sessionStorage import codec
+from ..sessionStorage.interviewState import InterviewState
+
+WORDS = (
+    "pain knee back sharp dull morning evening stairs sitting walking swelling "
+    "since weeks worse better after before rest work sleep left right lower"
+).split()
+
+
+def sentence(seed: int, words: int = 12) -> str:
+    # Varied text, so compression is not flattered by identical turns.
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "?"
+
+
+def legacy_session(turns: int) -> dict:
+    return {
+        "user_id": 42,
+        "initialPainPoints": "left knee, lower back",
+        "questionsAsked": [sentence(i) for i in range(turns)],
+        "answers": [sentence(-i - 1) for i in range(turns)],
+        "llmUsage": {"calls": turns, "wall_ms": 812.4, "prompt_tokens": 5120},
+    }
+
+
+def state_session(turns: int) -> dict:
+    return {"interview": InterviewState.from_legacy(legacy_session(turns))}
+
+
+def resident_bytes(build, sessions: int) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build() for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) // sessions
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_encoding(turns: int, repeat: int = 2000):
+    legacy = legacy_session(turns)
+    state = state_session(turns)
+    legacy_json = json.dumps(legacy)
+    blob = codec.encode(state)
+    print(
+        f"  encoded bytes: legacy json {len(legacy_json)}, "
+        f"codec {len(blob)} ({blob[:1].decode()})"
+    )
+    print(
+        "  encode us:     legacy json "
+        f"{timed(lambda: json.dumps(legacy), repeat):.1f}, "
+        f"codec {timed(lambda: codec.encode(state), repeat):.1f}"
+    )
+    print(
+        "  decode us:     legacy json "
+        f"{timed(lambda: json.loads(legacy_json), repeat):.1f}, "
+        f"codec {timed(lambda: codec.decode(blob), repeat):.1f}"
+    )
+
+
+def bench_history(turns: int, uses_per_turn: int = 4):
+    """One interview, building the paired history as often as a /next does."""
+    questions = [sentence(i) for i in range(turns)]
+    answers = [sentence(-i - 1) for i in range(turns)]
+    legacy = {"questionsAsked": [], "answers": []}
+    start = time.perf_counter()
+    for i in range(turns):
+        legacy["questionsAsked"].append(questions[i])
+        legacy["answers"].append(answers[i])
+        for _ in range(uses_per_turn):
+            dict(zip(legacy["questionsAsked"], legacy["answers"]))
+    zipped = (time.perf_counter() - start) * 1e6
+
+    state = InterviewState(42, "left knee, lower back")
+    start = time.perf_counter()
+    for i in range(turns):
+        state.ask(questions[i])
+        state.answer(answers[i])
+        for _ in range(uses_per_turn):
+            state.paired()
+    cached = (time.perf_counter() - start) * 1e6
+    print(f"  history build us per interview: zip {zipped:.0f}, cached {cached:.0f}")
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    print(f"{turns} turns, msgpack {'on' if codec.msgpack else 'off'}")
+    print(
+        f"  resident bytes per session: "
+        f"legacy {resident_bytes(lambda: legacy_session(turns), sessions)}, "
+        f"state {resident_bytes(lambda: state_session(turns), sessions)}"
+    )
+    bench_encoding(turns)
+    bench_history(turns)
@@ -0,0 +1,72 @@
+"""
+Full-flow interview load test against the in-process app.
+
+Run it with the simulated backend so it needs no network or API key:
+
+    USE_GPT_MOCK=sim MOCK_LATENCY_MS=1200 MOCK_ERROR_RATE_429=0.02 \
+        python -m app.testing.load_test --users 50 --turns 6
+
+Each virtual user runs /initial, `turns` x /next and /diagnos on its own
+thread, like concurrent browser sessions hitting one worker.
+"""
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..ai.telemetry import percentile
+from ..main import app
+from ..utils.jwt_handler import create_token
+
+LOCATIONS = ["head", "chest", "abdomen", "back", "arms", "legs"]
+
+
+def run_user(user_id: int, turns: int, latencies: dict, errors: dict, lock):
+    client = app.test_client()
+    token = create_token({"sub": str(user_id), "exp": int(time.time()) + 3600})
+    headers = {"access-token": token, "X-Cache-Bypass": "1"}
+
+    steps = [("initial", {"body_locations": random.sample(LOCATIONS, 2)})]
+    steps += [("next", {"answer": random.choice(["yes", "no"])})] * turns
+    steps += [("diagnos", {"answer": random.choice(["yes", "no"])})]
+
+    for endpoint, body in steps:
+        start = time.perf_counter()
+        response = client.post(f"/api/questions/{endpoint}", json=body, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if response.status_code == 200:
+                latencies.setdefault(endpoint, []).append(elapsed)
+            else:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+        if response.status_code != 200:
+            return
+        headers["X-Session-Id"] = response.headers["X-Session-Id"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=6)
+    args = parser.parse_args()
+
+    latencies, errors, lock = {}, {}, threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for user_id in range(1, args.users + 1):
+            pool.submit(run_user, user_id, args.turns, latencies, errors, lock)
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(v) for v in latencies.values()) + sum(errors.values())
+    print(f"{args.users} users, {requests} requests in {elapsed:.1f}s")
+    print(f"throughput: {requests / elapsed:.1f} req/s, errors: {errors or 'none'}")
+    print("=" * 50)
+    for endpoint, values in latencies.items():
+        values.sort()
+        p50, p95, p99 = (percentile(values, p) for p in (0.5, 0.95, 0.99))
+        print(
+            f"{endpoint:>8}  n={len(values):<5} p50={p50:7.0f}ms"
+            f"  p95={p95:7.0f}ms  p99={p99:7.0f}ms"
+        )
@@ -0,0 +1,56 @@
+import threading
+from pathlib import Path
+
+from ..ai.config import AISettings
+from .graph import TriageGraph
+
+DEFAULT_GRAPH = Path(__file__).with_name("default_graph.json")
+
+
+class TriageEngine:
+    """Serves questions from a local graph and counts how often it could."""
+
+    def __init__(self, graph: TriageGraph):
+        self.graph = graph
+        self._lock = threading.Lock()
+        self._stats = {"served_locally": 0, "fallbacks": 0}
+
+    def next_question(self, pain_points, questions_asked: list, answers: list):
+        question = self.graph.next_question(pain_points, questions_asked, answers)
+        with self._lock:
+            self._stats["served_locally" if question else "fallbacks"] += 1
+        return question
+
+    def covers(self, pain_points, questions_asked: list, answers: list) -> bool:
+        """Like next_question but without counting a step."""
+        question = self.graph.next_question(pain_points, questions_asked, answers)
+        return question is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        steps = stats["served_locally"] + stats["fallbacks"]
+        stats["local_ratio"] = stats["served_locally"] / steps if steps else 0.0
+        stats["graph_version"] = self.graph.version
+        stats["nodes"] = len(self.graph.nodes)
+        return stats
+
+
+_engine = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_triage_engine():
+    """The deployment's engine, or None when TRIAGE_MODE is not "local"."""
+    global _engine, _loaded
+
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                settings = AISettings()
+                if settings.triage_mode == "local":
+                    path = settings.triage_graph_path or DEFAULT_GRAPH
+                    _engine = TriageEngine(TriageGraph.load(path))
+                _loaded = True
+    return _engine
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # YAML graphs are optional; JSON needs nothing extra.
+    yaml = None
+
+YES, NO = "yes", "no"
+
+
+class TriageNode:
+    __slots__ = ("id", "question", "yes", "no")
+
+    def __init__(self, id: str, question: str, yes=None, no=None):
+        self.id = id
+        self.question = question
+        self.yes = yes
+        self.no = no
+
+
+class TriageGraph:
+    """
+    A yes/no decision graph compiled for O(1) node lookups.
+
+    Each opening (a set of body locations) points at a start node; each node
+    holds one question and the node to go to for each answer. A missing
+    branch means the path has left the graph.
+    """
+
+    def __init__(self, openings: dict, nodes: dict, version=None):
+        self.openings = openings
+        self.nodes = nodes
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "TriageGraph":
+        nodes = {}
+        for node_id, node in spec.get("nodes", {}).items():
+            nodes[node_id] = TriageNode(
+                node_id, node["question"].strip(), node.get(YES), node.get(NO)
+            )
+
+        for node in nodes.values():
+            for target in (node.yes, node.no):
+                if target is not None and target not in nodes:
+                    raise ValueError(
+                        f"Triage node {node.id} points at unknown {target}"
+                    )
+
+        openings = {}
+        for opening in spec.get("openings", []):
+            if opening["start"] not in nodes:
+                raise ValueError(f"Triage opening points at unknown {opening['start']}")
+            openings[opening_key(opening["pain_points"])] = opening["start"]
+
+        return cls(openings, nodes, spec.get("version"))
+
+    @classmethod
+    def load(cls, path) -> "TriageGraph":
+        path = Path(path)
+        text = path.read_text(encoding="utf-8")
+        if path.suffix in (".yaml", ".yml"):
+            if yaml is None:
+                raise RuntimeError("PyYAML is required to load YAML triage graphs")
+            return cls.from_dict(yaml.safe_load(text))
+        return cls.from_dict(json.loads(text))
+
+    def next_question(self, pain_points, questions_asked: list, answers: list):
+        """
+        The question to ask after the given turns, or None once the
+        interview has left the graph.
+        """
+        node_id = self.openings.get(opening_key(pain_points))
+        if node_id is None or len(questions_asked) != len(answers):
+            return None
+
+        for asked, answer in zip(questions_asked, answers):
+            node = self.nodes[node_id]
+            # An earlier step came from the LLM, so we are off the graph.
+            if asked != node.question:
+                return None
+            answer = str(answer).strip().lower()
+            node_id = node.yes if answer == YES else node.no if answer == NO else None
+            if node_id is None:
+                return None
+
+        return self.nodes[node_id].question
+
+
+def opening_key(pain_points) -> frozenset:
+    if isinstance(pain_points, str):
+        pain_points = pain_points.split(",")
+    return frozenset(p.strip().lower() for p in pain_points if p.strip())
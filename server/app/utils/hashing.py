@@ -1,11 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from bcrypt import gensalt, hashpw, checkpw
 
+from app.settings import settings
+from app.utils.per_process import PerProcess
+
+# bcrypt releases the GIL, so hashing on request threads lets a burst of
+# logins take every core at once. Instead it runs on a small pool: at most
+# password_hash_workers hashes burn CPU at a time and the request threads
+# only wait, leaving the rest of the worker responsive.
+_pool = PerProcess(
+    lambda: ThreadPoolExecutor(
+        max_workers=settings.password_hash_workers,
+        thread_name_prefix="password-hash",
+    )
+)
+_lock = threading.Lock()
+_stats = {"hashed": 0, "verified": 0, "rehashed": 0, "pending": 0}
+
+
+def _run(fn, *args):
+    pool = _pool.get()
+    with _lock:
+        _stats["pending"] += 1
+    try:
+        return pool.submit(fn, *args).result()
+    finally:
+        with _lock:
+            _stats["pending"] -= 1
+
+
+def _count(name: str):
+    with _lock:
+        _stats[name] += 1
+
 
 def hash_password(password: str) -> str:
-    salt = gensalt()
-    hashed = hashpw(password.encode("utf-8"), salt)
+    salt = gensalt(rounds=settings.bcrypt_rounds)
+    hashed = _run(hashpw, password.encode("utf-8"), salt)
+    _count("hashed")
     return hashed.decode("utf-8")
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    valid = _run(checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+    _count("verified")
+    return valid
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a cost other than bcrypt_rounds."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != settings.bcrypt_rounds
+
+
+def upgraded_hash(password: str, hashed_password: str):
+    """A fresh hash of a verified password whose hash used an outdated cost."""
+    if not needs_rehash(hashed_password):
+        return None
+    _count("rehashed")
+    return hash_password(password)
+
+
+def password_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["workers"] = settings.password_hash_workers
+    stats["rounds"] = settings.bcrypt_rounds
+    return stats
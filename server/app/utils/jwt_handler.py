@@ -1,10 +1,47 @@
+import hashlib
+import logging
+from time import time
+
 import jwt
+from app.auth.revocation import revocation_list
 from app.settings import settings
+from app.utils.ttl_cache import TTLCache
 from flask import abort
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = settings.secret_key
 
 
+class VerifiedTokenCache(TTLCache):
+    """
+    Bounded LRU of tokens that already passed signature verification, keyed
+    by a digest of the whole token and holding the decoded payload until the
+    token's `exp`. A token is only ever added after jwt.decode accepted it,
+    and any change to it changes the key, so a hit is as good as verifying
+    again. Tokens without an `exp` are never cached.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        # `exp` is a Unix timestamp, so entries expire on the wall clock.
+        super().__init__(max_entries, clock=time)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, token: str):
+        return super().get(self.key(token))
+
+    def put(self, token: str, payload: dict):
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)):
+            super().put(self.key(token), payload, expires_at)
+
+
+token_cache = VerifiedTokenCache(settings.token_cache_size)
+
+
 def create_token(data: dict):
     return jwt.encode(payload=data, key=SECRET_KEY, algorithm="HS256")
 
@@ -22,11 +59,18 @@ def validate_access_token(access_token: str):
 
 
 def validate_access_token_helper(token: str):
-    try:
-        print(token)
-        payload = jwt.decode(jwt=token, key=SECRET_KEY, algorithms=["HS256"])
-        print("payload:", payload)
-        return payload
-    except Exception as e:
-        print(e)
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(jwt=token, key=SECRET_KEY, algorithms=["HS256"])
+        except jwt.InvalidTokenError as e:
+            logger.info("Rejected access token: %s", e)
+            return False
+        logger.debug("Verified token for sub=%s", payload.get("sub"))
+        token_cache.put(token, payload)
+    # Checked on cache hits too, so revoking a token takes effect at once.
+    if revocation_list.is_revoked(payload.get("jti")):
+        logger.info("Rejected revoked token for sub=%s", payload.get("sub"))
         return False
+    # A copy, so a caller changing it cannot alter later requests.
+    return dict(payload)
@@ -0,0 +1,51 @@
+import os
+import threading
+
+
+class PerProcess:
+    """
+    One lazily built `factory()` result per process.
+
+    Threads do not survive a fork, so anything that owns one (a daemon
+    thread, a thread pool, an event loop) must be built again in each
+    gunicorn worker; the first caller in a new process does that.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        return self.ensure()[0]
+
+    def ensure(self):
+        """(value, created), created being True only for the call that built it."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._value, False
+        with self._lock:
+            if self._pid == pid:
+                return self._value, False
+            self._value = self._factory()
+            self._pid = pid
+        return self._value, True
+
+    def current(self):
+        """This process's value, or None if it has not been built here."""
+        return self._value if self._pid == os.getpid() else None
+
+    def reset(self):
+        """Forget this process's value and return it; get() builds a new one."""
+        with self._lock:
+            value = self.current()
+            self._value = None
+            self._pid = None
+        return value
+
+
+def daemon_thread(target, name: str) -> threading.Thread:
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    return thread
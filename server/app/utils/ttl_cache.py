@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class TTLCache:
+    """
+    Bounded LRU whose entries also expire, safe to share between request
+    threads. An entry lives `ttl` seconds from when it was put, or until the
+    `expires_at` passed to put(), read on `clock`. max_entries 0 disables
+    the cache.
+
+    Subclasses that need more done under the same lock use _get/_put while
+    holding self._lock.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None, clock=monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def contains(self, key) -> bool:
+        """Check for a live entry without touching LRU order or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] > self.clock()
+
+    def put(self, key, value, expires_at: float = None):
+        with self._lock:
+            self._put(key, value, expires_at)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+        if self.ttl is not None:
+            stats["ttl_seconds"] = self.ttl
+        return stats
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _put(self, key, value, expires_at: float = None):
+        if self.max_entries <= 0:
+            return
+        if expires_at is None:
+            expires_at = self.clock() + self.ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,16 @@
+import os
+
+# app.settings needs these at import time; the tests never reach a database
+# or the Gemini API.
+for name, value in {
+    "DB_USR": "test",
+    "DB_PWD": "test",
+    "DB_ADR": "/tmp",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test-secret-key-that-is-long-enough-for-hs256",
+    "ISSUER": "test",
+    "GEMINI_API_KEY": "test",
+    "USE_GPT_MOCK": "1",
+}.items():
+    os.environ.setdefault(name, value)
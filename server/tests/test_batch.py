@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.ai import batch, gemini_client
+from app.ai.circuit_breaker import CircuitBreaker
+from app.ai.config import AISettings
+from app.ai.event_loop import get_loop_runner
+from app.ai.hedging import Hedger
+from app.ai.rate_limit import TokenBucket
+from app.ai.scheduler import LLMScheduler
+
+
+def test_scheduled_batch_call_is_retried_by_one_layer(monkeypatch):
+    monkeypatch.setattr(gemini_client, "breaker", CircuitBreaker(failure_threshold=0))
+    monkeypatch.setattr(gemini_client, "scheduler", LLMScheduler(max_retries=2))
+    monkeypatch.setattr(gemini_client, "hedger", Hedger(enabled=False))
+    monkeypatch.setattr(batch, "backoff_delay", lambda attempt: 0)
+    client = gemini_client.GeminiClient()
+    calls = []
+
+    async def unavailable(prompt, route, call):
+        call.dispatched()
+        calls.append(prompt)
+        raise google_exceptions.ServiceUnavailable("upstream down")
+
+    monkeypatch.setattr(client, "_generate", unavailable)
+    item = {"id": "t1", "prompt": "diagnose"}
+
+    # Only calls on the worker's loop go through the scheduler.
+    result = get_loop_runner().run(
+        batch._diagnose(client, item, TokenBucket(0), retries=2)
+    )
+    assert not result["ok"]
+    assert result["attempts"] == 3
+    assert len(calls) == 3
+
+
+class EchoClient:
+    async def generate_response(self, prompt, **kwargs):
+        return "diagnosis"
+
+
+GOOD = (
+    '{"id": "ok", "pain_points": ["head"], "questions": ["Fever?"], "answers": ["yes"]}'
+)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "[1, 2]",
+        '"x"',
+        "not json",
+        '{"pain_points": [1], "questions": [], "answers": []}',
+        '{"pain_points": "head", "questions": [["q"]], "answers": ["yes"]}',
+        '{"pain_points": {"a": 1}, "questions": [], "answers": []}',
+    ],
+)
+def test_bad_transcript_gets_a_result_instead_of_hanging(line):
+    async def scenario():
+        report = batch.BatchReport()
+        results = []
+        async for result in batch.run_batch(
+            EchoClient(), [line, GOOD], 2, 0, 100, report
+        ):
+            results.append(result)
+        return results
+
+    results = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    by_id = {result["id"]: result for result in results}
+    assert by_id["ok"]["ok"]
+    assert not by_id[0]["ok"]
+    assert by_id[0]["error"].startswith("bad transcript")
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        {"concurrency": 0},
+        {"concurrency": -1},
+        {"retries": -1},
+        {"rate": 0},
+        {"rate": -2.0},
+        {"rate": float("nan")},
+    ],
+)
+def test_batch_limits_reject_non_positive_values(limits):
+    with pytest.raises(ValueError):
+        batch.batch_limits(clamp=True, **limits)
+
+
+def test_batch_limits_clamp_to_settings():
+    settings = AISettings()
+    concurrency, retries, rate = batch.batch_limits(10**6, 10**6, 10.0**6, clamp=True)
+    assert concurrency == settings.batch_concurrency
+    assert retries == settings.batch_max_retries
+    assert rate == settings.batch_rate_limit
@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.ai import gemini_client
+from app.ai.circuit_breaker import CircuitBreaker, CircuitOpen
+from app.ai.hedging import Hedger
+from app.ai.scheduler import LLMScheduler, QueueFull
+
+RESET_TIMEOUT = 0.05
+
+
+class FakeUpstream:
+    """Stands in for GeminiClient._generate; fails while `healthy` is False."""
+
+    def __init__(self):
+        self.healthy = True
+        self.calls = 0
+        self.delay = 0
+
+    async def __call__(self, prompt, route, call):
+        call.dispatched()
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if not self.healthy:
+            raise google_exceptions.ServiceUnavailable("upstream down")
+        return f"answer to {prompt}"
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET_TIMEOUT)
+    monkeypatch.setattr(gemini_client, "breaker", breaker)
+    # A fresh scheduler per test (it binds to the first loop it runs on),
+    # without retries so every call is exactly one upstream attempt.
+    monkeypatch.setattr(gemini_client, "scheduler", LLMScheduler(max_retries=0))
+    monkeypatch.setattr(gemini_client, "hedger", Hedger(enabled=False))
+    return breaker
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = FakeUpstream()
+    client = gemini_client.GeminiClient()
+    monkeypatch.setattr(client, "_generate", upstream)
+    upstream.client = client
+    return upstream
+
+
+async def ask(upstream, prompt="prompt"):
+    return await upstream.client.generate_response(prompt, kind="next")
+
+
+async def trip(upstream, breaker):
+    upstream.healthy = False
+    for i in range(breaker.failure_threshold):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            await ask(upstream, f"failing {i}")
+    assert breaker.stats()["state"] == "open"
+
+
+def test_trips_after_consecutive_failures(breaker, upstream):
+    async def scenario():
+        await trip(upstream, breaker)
+        calls = upstream.calls
+        with pytest.raises(CircuitOpen):
+            await ask(upstream)
+        # Refused without reaching upstream.
+        assert upstream.calls == calls
+
+    asyncio.run(scenario())
+
+
+def test_stays_open_until_reset_timeout(breaker, upstream):
+    async def scenario():
+        await trip(upstream, breaker)
+        upstream.healthy = True
+        for _ in range(3):
+            with pytest.raises(CircuitOpen):
+                await ask(upstream)
+        assert breaker.stats()["state"] == "open"
+
+    asyncio.run(scenario())
+
+
+def test_half_open_trial_closes_on_success(breaker, upstream):
+    async def scenario():
+        await trip(upstream, breaker)
+        upstream.healthy = True
+        await asyncio.sleep(RESET_TIMEOUT * 2)
+
+        upstream.delay = 0.05
+        trial = asyncio.create_task(ask(upstream, "trial"))
+        await asyncio.sleep(0.01)
+        assert breaker.stats()["state"] == "half_open"
+        # Only one trial at a time.
+        with pytest.raises(CircuitOpen):
+            await ask(upstream, "second")
+        assert await trial == "answer to trial"
+
+        assert breaker.stats()["state"] == "closed"
+        upstream.delay = 0
+        assert await ask(upstream, "after") == "answer to after"
+
+    asyncio.run(scenario())
+
+
+def test_half_open_trial_reopens_on_failure(breaker, upstream):
+    async def scenario():
+        await trip(upstream, breaker)
+        await asyncio.sleep(RESET_TIMEOUT * 2)
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            await ask(upstream, "trial")
+        assert breaker.stats()["state"] == "open"
+        with pytest.raises(CircuitOpen):
+            await ask(upstream)
+
+        # And it still recovers once upstream does.
+        upstream.healthy = True
+        await asyncio.sleep(RESET_TIMEOUT * 2)
+        assert await ask(upstream, "recovered") == "answer to recovered"
+        assert breaker.stats()["state"] == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_trial_slot_released_when_call_never_dispatched(
+    breaker, upstream, monkeypatch
+):
+    async def scenario():
+        await trip(upstream, breaker)
+        upstream.healthy = True
+        await asyncio.sleep(RESET_TIMEOUT * 2)
+
+        async def queue_full(kind, make_coro, deadline=None, max_retries=None):
+            raise QueueFull("LLM queue is full")
+
+        real_submit = gemini_client.scheduler.submit
+        monkeypatch.setattr(gemini_client.scheduler, "submit", queue_full)
+        with pytest.raises(QueueFull):
+            await ask(upstream, "queued")
+        monkeypatch.setattr(gemini_client.scheduler, "submit", real_submit)
+
+        assert await ask(upstream, "trial") == "answer to trial"
+        assert breaker.stats()["state"] == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_trial_slot_released_by_single_flight_joiner(breaker, upstream):
+    async def scenario():
+        await trip(upstream, breaker)
+        upstream.healthy = True
+        await asyncio.sleep(RESET_TIMEOUT * 2)
+
+        # The first caller takes the trial; the second, identical one joins it.
+        upstream.delay = 0.05
+        results = await asyncio.gather(
+            ask(upstream, "same"), ask(upstream, "same"), return_exceptions=True
+        )
+        assert upstream.calls == breaker.failure_threshold + 1
+        assert results[0] == "answer to same"
+        assert breaker.stats()["state"] == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_hedge_wins_when_first_attempt_is_slow():
+    hedger = Hedger(enabled=True, percentile=0, min_delay_ms=10, budget=1.0, warmup=1)
+    attempts = []
+
+    async def make_coro():
+        attempts.append(None)
+        # The first attempt hangs, the hedge answers at once.
+        await asyncio.sleep(5 if len(attempts) == 1 else 0)
+        return len(attempts)
+
+    async def scenario():
+        await hedger.run("next", lambda: asyncio.sleep(0, result="warm"))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await hedger.run("next", make_coro)
+        return result, loop.time() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == 2
+    assert elapsed < 1
+    stats = hedger.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedge_budget_caps_hedged_calls():
+    # Percentile 0 keeps the hedge delay at the fast warm-up call's latency.
+    hedger = Hedger(enabled=True, percentile=0, min_delay_ms=10, budget=0.25, warmup=1)
+
+    async def slow():
+        await asyncio.sleep(0.03)
+        return "ok"
+
+    async def scenario():
+        await hedger.run("next", lambda: asyncio.sleep(0, result="warm"))
+        for _ in range(7):
+            assert await hedger.run("next", slow) == "ok"
+
+    asyncio.run(scenario())
+    stats = hedger.stats()
+    # Eight eligible calls at a 25% budget allow two hedges.
+    assert stats["calls"] == 8
+    assert stats["hedged"] == 2
+    assert stats["over_budget"] == 5
+    assert stats["hedged"] <= hedger.budget * stats["calls"]
@@ -0,0 +1,51 @@
+from app.sessionStorage import codec
+from app.sessionStorage.interviewState import InterviewState
+
+
+def interview(turns: int = 3) -> InterviewState:
+    state = InterviewState(7, "head, chest")
+    for i in range(turns):
+        state.ask(f"Question {i}?")
+        state.answer("yes" if i % 2 else "no")
+    state.ask("Pending?")
+    return state
+
+
+def test_turns_are_stored_flat():
+    state = interview(2)
+    assert state.log == ["Question 0?", "no", "Question 1?", "yes"]
+    assert state.paired() == {"Question 0?": "no", "Question 1?": "yes"}
+    assert state.questions == ["Question 0?", "Question 1?", "Pending?"]
+    assert state.answers == ["no", "yes"]
+    assert state.paired_with("yes")["Pending?"] == "yes"
+
+
+def test_round_trips_through_the_codec():
+    session = {"interview": interview(), "user_id": 7}
+    assert codec.decode(codec.encode(session)) == session
+
+
+def test_long_sessions_are_compressed():
+    session = {"interview": interview(1000)}
+    blob = codec.encode(session)
+    assert blob[:1].isupper()
+    assert codec.decode(blob) == session
+
+
+def test_reads_version_1_pairs():
+    data = interview(2).to_dict()
+    data["v"] = 1
+    data["t"] = [["Question 0?", "no"], ["Question 1?", "yes"]]
+    assert InterviewState.from_dict(data) == interview(2)
+
+
+def test_upgrades_legacy_sessions():
+    state = InterviewState.from_legacy(
+        {
+            "user_id": 7,
+            "initialPainPoints": "head, chest",
+            "questionsAsked": ["Question 0?", "Question 1?", "Pending?"],
+            "answers": ["no", "yes"],
+        }
+    )
+    assert state == interview(2)
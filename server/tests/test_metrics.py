@@ -0,0 +1,39 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.decorators import decorators
+from app.main import app
+from app.utils.jwt_handler import create_token
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # with_authenticated_user loads the user; there is no database here.
+    monkeypatch.setattr(
+        decorators.user_cache, "get", lambda db, user_id: SimpleNamespace(id=user_id)
+    )
+    return app.test_client()
+
+
+def headers(*roles):
+    token = create_token(
+        {"sub": "1", "exp": int(time.time()) + 600, "roles": list(roles)}
+    )
+    return {"access-token": token}
+
+
+def test_metrics_need_an_access_token(client):
+    assert client.get("/api/metrics").status_code == 401
+
+
+def test_metrics_need_an_operator_role(client):
+    assert client.get("/api/metrics", headers=headers("patient")).status_code == 403
+
+
+@pytest.mark.parametrize("role", ["admin", "support"])
+def test_metrics_for_operators(client, role):
+    response = client.get("/api/metrics", headers=headers(role))
+    assert response.status_code == 200
+    assert "llm" in response.json
@@ -0,0 +1,26 @@
+import asyncio
+
+from app.ai.mock_backend import SimulatedModel
+
+
+def completion_lengths(max_output_tokens, calls=50):
+    model = SimulatedModel(latency_ms=0, completion_tokens=40, tokens_per_second=1e9)
+
+    async def scenario():
+        lengths = []
+        for _ in range(calls):
+            response = await model.generate_content_async(
+                "prompt", generation_config={"max_output_tokens": max_output_tokens}
+            )
+            lengths.append(response.usage_metadata.candidates_token_count)
+        return lengths
+
+    return asyncio.run(scenario())
+
+
+def test_route_cap_does_not_stretch_typical_replies():
+    assert max(completion_lengths(1024)) <= 40
+
+
+def test_route_cap_still_bounds_replies():
+    assert max(completion_lengths(8)) <= 8
@@ -0,0 +1,26 @@
+import os
+
+from app.utils import per_process
+from app.utils.per_process import PerProcess
+
+
+def test_built_once_per_process(monkeypatch):
+    built = []
+    holder = PerProcess(lambda: built.append(os.getpid()) or len(built))
+
+    assert holder.ensure() == (1, True)
+    assert holder.ensure() == (1, False)
+
+    # A forked worker sees a new pid and builds its own.
+    monkeypatch.setattr(per_process.os, "getpid", lambda: -1)
+    assert holder.current() is None
+    assert holder.get() == 2
+    assert len(built) == 2
+
+
+def test_reset_returns_value_and_rebuilds():
+    holder = PerProcess(object)
+    first = holder.get()
+    assert holder.reset() is first
+    assert holder.current() is None
+    assert holder.get() is not first
@@ -0,0 +1,23 @@
+from app.ai.prompt_budget import compact_history, recent_history
+from app.sessionStorage.interviewState import InterviewState
+
+
+def test_older_turns_fold_into_the_summary_once():
+    state = InterviewState(1, "head")
+    calls = []
+
+    def summarize(prompt):
+        calls.append(prompt)
+        return "summary"
+
+    for turn in range(10):
+        state.ask(f"Does the pain in area {turn} get worse when you lie down?")
+        state.answer("yes")
+        summary, recent = compact_history(
+            state, state.paired(), summarize, budget=60, keep_recent=2
+        )
+
+    assert calls
+    assert summary == "summary"
+    assert recent_history(state, state.paired()) == (summary, recent)
+    assert state.summarized_turns + len(recent) == 10
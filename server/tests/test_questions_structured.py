@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from app.main import app
+from app.routers import questions
+from app.schemas.questionSchemas import NextStepSchema
+from app.utils.jwt_handler import create_token
+
+
+def step(question: str, is_final: bool = False) -> NextStepSchema:
+    return NextStepSchema(
+        question=question,
+        is_final=is_final,
+        diagnosis="Migraine" if is_final else "",
+        confidence="high" if is_final else "",
+        recommendation="see_gp" if is_final else "",
+        advice="Rest in a dark room." if is_final else "",
+    )
+
+
+@pytest.fixture
+def interview(monkeypatch):
+    """A structured-mode interview whose LLM replies are queued by the test."""
+    monkeypatch.setattr(questions.ai_settings, "structured_output", True)
+    replies = []
+    generated = []
+
+    async def generate(client, kind, prompt, priority=None, usage=None):
+        generated.append(kind)
+        return replies.pop(0)
+
+    monkeypatch.setattr(questions, "_generate", generate)
+    persisted, recorded = [], []
+    monkeypatch.setattr(
+        questions.diagnosis_writer, "submit", lambda **row: persisted.append(row)
+    )
+    monkeypatch.setattr(
+        questions.telemetry, "record_interview", lambda usage: recorded.append(usage)
+    )
+
+    client = app.test_client()
+    token = create_token({"sub": "7", "exp": int(time.time()) + 600})
+    headers = {"access-token": token, "X-Cache-Bypass": "1"}
+
+    def post(path, body):
+        response = client.post(f"/api/questions{path}", json=body, headers=headers)
+        if "X-Session-Id" in response.headers:
+            headers["X-Session-Id"] = response.headers["X-Session-Id"]
+        return response
+
+    return post, replies, persisted, recorded
+
+
+def test_interview_ended_at_next_is_persisted_and_counted(interview):
+    post, replies, persisted, recorded = interview
+    replies += [step("Does light bother you?"), step("", is_final=True)]
+
+    assert post("/initial", {"body_locations": ["head"]}).status_code == 200
+    body = post("/next", {"answer": "yes"}).json
+
+    assert body["is_final"] is True
+    assert body["diagnosis"] == "Migraine"
+    assert len(recorded) == 1
+    assert [row["predicted"] for row in persisted] == ["Migraine"]
+    assert persisted[0]["qa_pairs"] == [
+        {"question": "Does light bother you?", "answer": "yes"}
+    ]
+
+
+def test_later_diagnos_does_not_count_it_twice(interview):
+    post, replies, persisted, recorded = interview
+    replies += [step("Does light bother you?"), step("", is_final=True)]
+    post("/initial", {"body_locations": ["head"]})
+    post("/next", {"answer": "yes"})
+
+    replies.append(step("", is_final=True))
+    post("/diagnos", {"answer": "yes"})
+    assert len(recorded) == 1
+    assert len(persisted) == 1
+
+
+def test_ongoing_interview_is_not_persisted(interview):
+    post, replies, persisted, recorded = interview
+    replies += [step("Does light bother you?"), step("Any nausea?")]
+    post("/initial", {"body_locations": ["head"]})
+    assert post("/next", {"answer": "yes"}).json["is_final"] is False
+    assert persisted == [] and recorded == []
+
+
+def test_text_fallback_is_not_cached_under_the_structured_key(interview, monkeypatch):
+    post, replies, persisted, recorded = interview
+    stored = []
+    monkeypatch.setattr(
+        questions.response_cache, "put", lambda key, value: stored.append(value)
+    )
+    replies += [step("Does light bother you?"), "Any nausea?"]
+    post("/initial", {"body_locations": ["head"]})
+    assert post("/next", {"answer": "yes"}).json["response"] == "Any nausea?"
+    assert stored == [step("Does light bother you?")]
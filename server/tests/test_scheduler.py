@@ -0,0 +1,28 @@
+import asyncio
+
+from app.ai.event_loop import get_loop_runner
+from app.ai.scheduler import LLMScheduler
+
+
+async def answer():
+    return "ok"
+
+
+def test_binds_to_the_worker_loop_only():
+    scheduler = LLMScheduler()
+
+    # per_request mode: a short-lived asyncio.run loop goes straight through.
+    assert asyncio.run(scheduler.submit("next", answer)) == "ok"
+    assert scheduler._loop is None
+    assert scheduler.stats()["unscheduled"] == 1
+
+    runner = get_loop_runner()
+    assert runner.run(scheduler.submit("next", answer)) == "ok"
+    assert scheduler._loop is runner.loop
+    assert scheduler.stats()["submitted"] == 1
+
+    # A later per_request call does not steal the binding.
+    assert asyncio.run(scheduler.submit("next", answer)) == "ok"
+    assert scheduler._loop is runner.loop
+    assert runner.run(scheduler.submit("next", answer)) == "ok"
+    assert scheduler.stats()["submitted"] == 2
@@ -0,0 +1,117 @@
+import fnmatch
+
+import pytest
+
+from app.sessionStorage.backends import MemoryBackend, RedisBackend, SQLiteBackend
+from app.sessionStorage.interviewState import InterviewState
+
+
+class FakeRedis:
+    """The slice of redis.Redis that RedisBackend uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.round_trips = 0
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def delete(self, key):
+        self.round_trips += 1
+        self.data.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        return [key.encode() for key in self.data if fnmatch.fnmatch(key, match)]
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        assert isinstance(value, bytes)
+        self.commands.append((key, value, ex))
+
+    def execute(self):
+        self.server.round_trips += 1
+        for key, value, ex in self.commands:
+            self.server.data[key] = value
+            self.server.expiry[key] = ex
+
+
+def interview_session() -> dict:
+    state = InterviewState(7, "head, chest")
+    state.ask("Do you have a fever?")
+    state.answer("yes")
+    state.ask("Is it worse at night?")
+    return {"interview": state, "user_id": 7}
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(ttl=60, sweep_interval=0)
+    if request.param == "sqlite":
+        return SQLiteBackend(ttl=60, path=str(tmp_path / "sessions.sqlite3"))
+    return RedisBackend(ttl=60, url="", client=FakeRedis())
+
+
+def test_saved_session_round_trips(backend):
+    session = interview_session()
+    backend.save("a", session)
+    assert backend.get("a") == session
+    assert backend.get("missing") == {}
+
+
+def test_many_sessions_at_once(backend):
+    backend.save_many({"a": {"user_id": 1}, "b": {"user_id": 2}})
+    assert backend.get_many(["a", "b", "c"]) == {
+        "a": {"user_id": 1},
+        "b": {"user_id": 2},
+        "c": {},
+    }
+    assert backend.all() == {"a": {"user_id": 1}, "b": {"user_id": 2}}
+
+
+def test_cleared_session_is_gone(backend):
+    backend.save("a", {"user_id": 1})
+    backend.clear("a")
+    assert backend.get("a") == {}
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_expired_session_reads_as_empty(kind, tmp_path):
+    if kind == "memory":
+        backend = MemoryBackend(ttl=0, sweep_interval=0)
+    else:
+        backend = SQLiteBackend(ttl=0, path=str(tmp_path / "sessions.sqlite3"))
+    backend.save("a", {"user_id": 1})
+    assert backend.get("a") == {}
+    assert backend.all() == {}
+
+
+def test_memory_backend_evicts_least_recently_saved():
+    backend = MemoryBackend(ttl=60, max_entries=2, sweep_interval=0)
+    backend.save("a", {"n": 1})
+    backend.save("b", {"n": 2})
+    backend.save("a", {"n": 3})
+    backend.save("c", {"n": 4})
+    assert backend.get("b") == {}
+    assert backend.get_many(["a", "c"]) == {"a": {"n": 3}, "c": {"n": 4}}
+    assert backend.stats()["evicted"] == 1
+
+
+def test_redis_backend_sets_server_expiry_and_pipelines():
+    server = FakeRedis()
+    backend = RedisBackend(ttl=900, url="", client=server, prefix="s:")
+    backend.save_many({"a": {"n": 1}, "b": interview_session()})
+    assert server.round_trips == 1
+    assert server.expiry == {"s:a": 900, "s:b": 900}
+    backend.get_many(["a", "b"])
+    assert server.round_trips == 2
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.ai.singleflight import SingleFlight
+
+
+class Upstream:
+    """Counts calls; each one waits for `release` and then answers or raises."""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.cancelled = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return f"answer {self.calls}"
+
+
+def test_identical_calls_share_one_request():
+    async def scenario():
+        flight, upstream = SingleFlight(), Upstream()
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await asyncio.gather(*waiters) == ["answer 1"] * 3
+        assert upstream.calls == 1
+        stats = flight.stats()
+        assert stats["leaders"] == 1
+        assert stats["deduplicated"] == 2
+        assert stats["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    async def scenario():
+        flight, upstream = SingleFlight(), Upstream(error=RuntimeError("down"))
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert upstream.calls == 1
+
+        # The next caller makes a fresh request rather than getting the error.
+        upstream.error = None
+        assert await flight.do("k", upstream) == "answer 2"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def scenario():
+        flight, upstream = SingleFlight(), Upstream()
+        first = asyncio.create_task(flight.do("k", upstream))
+        second = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        upstream.release.set()
+        assert await second == "answer 1"
+        assert upstream.cancelled == 0
+        assert flight.stats()["abandoned"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_last_waiter_cancelling_cancels_the_request():
+    async def scenario():
+        flight, upstream = SingleFlight(), Upstream()
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert upstream.cancelled == 1
+        stats = flight.stats()
+        assert (stats["abandoned"], stats["in_flight"]) == (1, 0)
+
+        # A later caller does not join the cancelled request.
+        upstream.release.set()
+        assert await flight.do("k", upstream) == "answer 2"
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+from app.ai.speculation import Speculator
+
+
+async def answer(text, delay=0):
+    await asyncio.sleep(delay)
+    return text
+
+
+def test_finished_branch_is_a_hit():
+    speculator = Speculator(max_wait=0.5)
+    speculator.launch("s", {"yes": lambda: answer("Y?"), "no": lambda: answer("N?")})
+    assert speculator.take("s", "Yes") == "Y?"
+    assert speculator.stats()["hits"] == 1
+
+
+def test_slow_branch_is_cancelled_after_max_wait():
+    speculator = Speculator(ttl=60, max_wait=0.05)
+    speculator.launch("s", {"yes": lambda: answer("Y?", delay=5)})
+    started = time.monotonic()
+    assert speculator.take("s", "yes") is None
+    assert time.monotonic() - started < 1
+    stats = speculator.stats()
+    assert stats["timed_out"] == 1
+    assert stats["misses"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import gemini_client
+from app.ai.routing import router
+from app.ai.telemetry import LLMCall
+from app.schemas.questionSchemas import NextStepSchema
+
+VALID = json.dumps(
+    {
+        "question": "Where does it hurt?",
+        "is_final": False,
+        "diagnosis": "",
+        "confidence": "",
+        "recommendation": "",
+        "advice": "",
+    }
+)
+# Cut off at max_output_tokens.
+TRUNCATED = VALID[:40]
+# The SDK sends no `required` list, so fields can be left out.
+INCOMPLETE = json.dumps({"question": "Where does it hurt?"})
+
+
+class FakeModel:
+    """Answers generate_content_async with the queued reply texts in turn."""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        return SimpleNamespace(text=self.texts.pop(0), usage_metadata=None)
+
+
+@pytest.fixture
+def client():
+    client = gemini_client.GeminiClient()
+    client.use_mock = False
+    return client
+
+
+def generate(client, model):
+    client._model = lambda route: model
+    route = router.route("next")
+    call = LLMCall("next", route.model, route.kind)
+    return asyncio.run(
+        client._generate_structured("prompt", NextStepSchema, route, call)
+    )
+
+
+@pytest.mark.parametrize("bad", [TRUNCATED, INCOMPLETE])
+def test_invalid_reply_is_asked_for_again(client, bad):
+    model = FakeModel(bad, VALID)
+    step = generate(client, model)
+    assert step.question == "Where does it hurt?"
+    assert model.calls == 2
+
+
+def test_gives_up_after_second_invalid_reply(client):
+    model = FakeModel(TRUNCATED, INCOMPLETE, VALID)
+    with pytest.raises(gemini_client.StructuredOutputInvalid):
+        generate(client, model)
+    assert model.calls == gemini_client.STRUCTURED_ATTEMPTS
@@ -0,0 +1,43 @@
+from app.utils.ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl_or_at_expires_at():
+    clock = Clock()
+    cache = TTLCache(max_entries=10, ttl=5, clock=clock)
+    cache.put("ttl", "x")
+    cache.put("until", "y", expires_at=2)
+    clock.now = 3
+    assert cache.contains("ttl")
+    assert cache.get("until") is None
+    clock.now = 5
+    assert cache.get("ttl") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["misses"] == 2
+    assert stats["ttl_seconds"] == 5
+
+
+def test_zero_size_disables_the_cache():
+    cache = TTLCache(max_entries=0, ttl=5)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0